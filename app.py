@@ -1,15 +1,36 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, send_file, g, has_app_context, Response, make_response
 from flask_wtf.csrf import CSRFProtect
 import mysql.connector
 import bcrypt
+import click
 import os
-from datetime import datetime
+import re
+import atexit
+import base64
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta
 import csv
+import gzip
+import hashlib
 import io
+import itertools
+import multiprocessing
+import socket
+import sqlite3
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import closing
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, PatternFill
+from openpyxl.utils import get_column_letter
 from openpyxl import load_workbook
-from functools import wraps
+from functools import lru_cache, wraps
 import logging
 
 app = Flask(__name__)
@@ -26,19 +47,362 @@ DB_CONFIG = {
     'database': 'protrack_rpt'
 }
 
+# Connection pool configuration (override via environment)
+DB_POOL_CONFIG = {
+    'size': int(os.environ.get('DB_POOL_SIZE', 5)),
+    'max_overflow': int(os.environ.get('DB_POOL_MAX_OVERFLOW', 10)),
+    'timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+    'max_lifetime': int(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+    'ping_on_borrow': os.environ.get('DB_POOL_PING_ON_BORROW', '1') == '1',
+}
+
+# Catalogue total-count caching (seconds); approximate counts use table statistics
+CATALOGUE_COUNT_TTL = int(os.environ.get('CATALOGUE_COUNT_TTL', 60))
+CATALOGUE_APPROX_COUNT = os.environ.get('CATALOGUE_APPROX_COUNT', '0') == '1'
+
+# Read-through cache for rarely changing query results (categories, catalogue pages):
+# entry lifetime in seconds and maximum number of entries
+QUERY_CACHE_TTL = int(os.environ.get('QUERY_CACHE_TTL', 300))
+QUERY_CACHE_SIZE = int(os.environ.get('QUERY_CACHE_SIZE', 1024))
+CATALOGUE_PAGE_TTL = int(os.environ.get('CATALOGUE_PAGE_TTL', 30))
+
+# Dashboard counters are recomputed into dashboard_stats when older than this (seconds)
+DASHBOARD_STATS_TTL = int(os.environ.get('DASHBOARD_STATS_TTL', 30))
+LOW_STOCK_THRESHOLD = 10
+
+# Rows fetched per round trip when streaming exports from an unbuffered cursor
+EXPORT_FETCH_SIZE = int(os.environ.get('EXPORT_FETCH_SIZE', 1000))
+
+# Rows sampled to size columns before a write-only Excel sheet starts streaming
+EXCEL_WIDTH_SAMPLE_ROWS = int(os.environ.get('EXCEL_WIDTH_SAMPLE_ROWS', 500))
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Server-sent events: keepalive interval (seconds) and replay buffer size
+SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 20))
+SSE_HISTORY = int(os.environ.get('SSE_HISTORY', 500))
+# Each stream is closed after this many seconds (browsers reconnect on their own) so it
+# does not pin a worker thread for as long as a dashboard tab stays open
+SSE_STREAM_SECONDS = int(os.environ.get('SSE_STREAM_SECONDS', 600))
+
+# Maximum number of orders accepted by one bulk approve/reject call
+BULK_ORDER_LIMIT = int(os.environ.get('BULK_ORDER_LIMIT', 1000))
+
+# Pending orders hold reserved stock for this many hours before expiring (0 disables)
+ORDER_RESERVATION_TTL_HOURS = int(os.environ.get('ORDER_RESERVATION_TTL_HOURS', 72))
+
+# Server-side carts are discarded this many hours after their last change
+CART_TTL_HOURS = int(os.environ.get('CART_TTL_HOURS', 72))
+
+# Shortest word indexed by InnoDB FULLTEXT (innodb_ft_min_token_size)
+FULLTEXT_MIN_TOKEN = int(os.environ.get('FULLTEXT_MIN_TOKEN', 3))
+
+# FULLTEXT column lists; MATCH() must name exactly the indexed columns
+CONSUMABLE_SEARCH_COLUMNS = ('name', 'description', 'category')
+ORDER_SEARCH_COLUMNS = ('user_name', 'department')
+ASSET_SEARCH_COLUMNS = ('name', 'asset_code', 'description')
+
+# Asset import rows per multi-row INSERT and per commit
+IMPORT_CHUNK_SIZE = int(os.environ.get('IMPORT_CHUNK_SIZE', 1000))
+
+# Parsed import previews are kept this long (minutes) for confirmation or re-upload
+IMPORT_PREVIEW_TTL_MINUTES = int(os.environ.get('IMPORT_PREVIEW_TTL_MINUTES', 60))
+
+# PDF reports: rows laid out per table chunk, cap on wrapped cell text, and the
+# row count above which a report is generated as a background job
+PDF_TABLE_ROWS = int(os.environ.get('PDF_TABLE_ROWS', 60))
+PDF_CELL_CHARS = int(os.environ.get('PDF_CELL_CHARS', 400))
+PDF_BACKGROUND_ROWS = int(os.environ.get('PDF_BACKGROUND_ROWS', 2000))
+
+# Largest accepted request body (uploads), in megabytes
+MAX_UPLOAD_MB = int(os.environ.get('MAX_UPLOAD_MB', 50))
+app.config['MAX_CONTENT_LENGTH'] = MAX_UPLOAD_MB * 1024 * 1024
+
+# Background jobs: SQLite queue + artifacts directory, worker processes, artifact lifetime (hours)
+JOB_DIR = os.environ.get('JOB_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs'))
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+JOB_TTL_HOURS = int(os.environ.get('JOB_TTL_HOURS', 24))
+JOB_PROGRESS_INTERVAL = 0.5
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
+class PooledConnection:
+    """Thin proxy around a MySQL connection borrowed from a ConnectionPool.
+
+    Route handlers keep calling close() as before: for request-bound
+    connections it is a no-op (the connection is released on teardown),
+    otherwise it returns the connection to the pool.
+    """
+
+    def __init__(self, pool, raw, created_at):
+        self._pool = pool
+        self._raw = raw
+        self.created_at = created_at
+        self.request_bound = False
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+    def close(self):
+        if not self.request_bound:
+            self.release()
+
+    def release(self):
+        """Hand the underlying connection back to the pool (idempotent)"""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.release(raw, self.created_at)
+
+    def discard(self):
+        """Drop the connection instead of reusing it (e.g. abandoned mid-result)"""
+        if self._raw is not None:
+            raw, self._raw = self._raw, None
+            self._pool.discard(raw)
+
+
+class ConnectionPool:
+    """Thread-safe MySQL connection pool with overflow, ping-on-borrow and max lifetime"""
+
+    def __init__(self, config, size=5, max_overflow=10, timeout=30, max_lifetime=1800, ping_on_borrow=True):
+        self.config = dict(config, consume_results=True)
+        self.size = size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.ping_on_borrow = ping_on_borrow
+        self._idle = deque()
+        self._cond = threading.Condition()
+        self._open = 0
+        self._borrowed = 0
+        self._waiting = 0
+        self._created = 0
+        self._recycled = 0
+
+    def _connect(self):
+        raw = mysql.connector.connect(**self.config)
+        with self._cond:
+            self._created += 1
+        return raw, time.monotonic()
+
+    def _expired(self, created_at):
+        return self.max_lifetime > 0 and time.monotonic() - created_at > self.max_lifetime
+
+    def _discard(self, raw):
+        try:
+            raw.close()
+        except Exception:
+            pass
+
+    def _is_alive(self, raw):
+        try:
+            raw.ping(reconnect=False)
+            return True
+        except mysql.connector.Error:
+            return False
+
+    def acquire(self):
+        """Borrow a connection, waiting up to `timeout` seconds when the pool is exhausted"""
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._idle:
+                    raw, created_at = self._idle.pop()
+                    break
+                if self._open < self.size + self.max_overflow:
+                    self._open += 1
+                    raw, created_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise mysql.connector.errors.PoolError('Timed out waiting for a database connection')
+                self._waiting += 1
+                try:
+                    self._cond.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+        try:
+            if raw is not None and (self._expired(created_at) or (self.ping_on_borrow and not self._is_alive(raw))):
+                self._discard(raw)
+                with self._cond:
+                    self._recycled += 1
+                raw = None
+            if raw is None:
+                raw, created_at = self._connect()
+        except Exception:
+            with self._cond:
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._borrowed += 1
+        return PooledConnection(self, raw, created_at)
+
+    def release(self, raw, created_at):
+        """Return a connection to the pool, discarding it if broken, expired or overflow"""
+        keep = True
+        try:
+            raw.rollback()
+        except Exception:
+            keep = False
+
+        with self._cond:
+            self._borrowed -= 1
+            if keep and self._expired(created_at):
+                self._recycled += 1
+                keep = False
+            if keep and len(self._idle) >= self.size:
+                keep = False
+            if keep:
+                self._idle.append((raw, created_at))
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if not keep:
+            self._discard(raw)
+
+    def discard(self, raw):
+        """Close a borrowed connection without returning it to the pool"""
+        with self._cond:
+            self._borrowed -= 1
+            self._open -= 1
+            self._cond.notify()
+        try:
+            # shutdown() drops the socket without draining an unread result set
+            getattr(raw, 'shutdown', raw.close)()
+        except Exception:
+            pass
+
+    def stats(self):
+        """Snapshot of pool counters for sizing"""
+        with self._cond:
+            return {
+                'size': self.size,
+                'max_overflow': self.max_overflow,
+                'open': self._open,
+                'idle': len(self._idle),
+                'borrowed': self._borrowed,
+                'waiting': self._waiting,
+                'created': self._created,
+                'recycled': self._recycled,
+            }
+
+
+db_pool = ConnectionPool(DB_CONFIG, **DB_POOL_CONFIG)
+
+
 def get_db_connection():
-    """Create and return a database connection"""
+    """Return a pooled database connection.
+
+    Within an app/request context one connection is shared via `g` and
+    released on teardown; outside a context close() returns it to the pool.
+    """
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
+        if has_app_context():
+            if 'db_connection' not in g:
+                connection = db_pool.acquire()
+                connection.request_bound = True
+                g.db_connection = connection
+            return g.db_connection
+        return db_pool.acquire()
     except mysql.connector.Error as err:
         logger.error(f"Database connection error: {err}")
         return None
 
+
+@app.teardown_appcontext
+def release_db_connection(exception=None):
+    """Return the request's pooled connection; uncommitted work is rolled back"""
+    connection = g.pop('db_connection', None)
+    if connection is not None:
+        connection.release()
+
+
+@app.errorhandler(413)
+def upload_too_large(error):
+    """Reject oversized uploads before they are parsed"""
+    message = f'File is too large (maximum {MAX_UPLOAD_MB} MB)'
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify({'error': message}), 413
+    flash(message, 'error')
+    return redirect(request.referrer or url_for('index'))
+
+
+# Audit entries are buffered and written in batches: flush at this many entries or
+# after this many seconds; batches the database refuses are spooled to a file
+AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+AUDIT_FLUSH_SECONDS = float(os.environ.get('AUDIT_FLUSH_SECONDS', 1.0))
+AUDIT_SPOOL_FILE = os.environ.get('AUDIT_SPOOL_FILE', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audit_spool.jsonl'))
+
+# Audit entries older than this many whole months are moved to gzip files in AUDIT_ARCHIVE_DIR
+AUDIT_RETENTION_MONTHS = int(os.environ.get('AUDIT_RETENTION_MONTHS', 12))
+AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'audit_archive'))
+AUDIT_ARCHIVE_BATCH = int(os.environ.get('AUDIT_ARCHIVE_BATCH', 5000))
+
+class EventBroker:
+    """In-process pub/sub feeding the server-sent events stream.
+
+    Events live in one shared ring buffer with increasing ids. Subscribers
+    only remember the last id they saw and sleep on a condition variable,
+    so idle clients hold no per-client queue and publishing is O(1).
+    """
+
+    def __init__(self, history=500):
+        self._events = deque(maxlen=history)
+        self._cond = threading.Condition()
+        self._next_id = 1
+
+    def publish(self, event, data):
+        with self._cond:
+            self._events.append((self._next_id, event, data))
+            self._next_id += 1
+            self._cond.notify_all()
+
+    def last_id(self):
+        with self._cond:
+            return self._next_id - 1
+
+    def wait(self, after_id, timeout):
+        """Return (events newer than after_id, missed); blocks up to timeout seconds.
+
+        `missed` is True when the client fell behind the replay buffer and
+        should resynchronise from the JSON endpoints.
+        """
+        with self._cond:
+            if self._next_id - 1 <= after_id:
+                self._cond.wait(timeout)
+            events = [e for e in self._events if e[0] > after_id]
+            missed = bool(events) and events[0][0] > after_id + 1
+            return events, missed
+
+
+event_broker = EventBroker(SSE_HISTORY)
+
+
+def _publish_order_changes(results, low_stock=0):
+    """Publish status deltas for orders whose approve/reject succeeded, plus any low-stock change"""
+    changes = [
+        {'order_id': order_id, 'status': r['status'], 'previous_status': r['previous_status']}
+        for order_id, r in results.items() if r.get('status')
+    ]
+    if changes:
+        event_broker.publish('orders', {'changes': changes})
+    if low_stock:
+        event_broker.publish('stock', {'reason': 'orders', 'changes': [], 'low_stock': low_stock})
+
+def _has_asset_code_index(cursor):
+    """Whether the unique (lab_id, asset_code) index that imports deduplicate against exists"""
+    cursor.execute("""
+        SELECT COUNT(*) FROM information_schema.statistics
+        WHERE table_schema = DATABASE() AND table_name = 'lab_assets' AND index_name = 'uq_lab_assets_lab_code'
+    """)
+    return cursor.fetchone()[0] > 0
+
+
 def init_database():
     """Initialize database tables if they don't exist"""
     connection = get_db_connection()
@@ -57,6 +421,7 @@ def init_database():
                 category VARCHAR(100),
                 quantity INT DEFAULT 0,
                 damaged INT DEFAULT 0,
+                borrowed INT NOT NULL DEFAULT 0,
                 returnable TINYINT(1) DEFAULT 1,
                 image_url VARCHAR(500),
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -71,6 +436,16 @@ def init_database():
             cursor.execute("ALTER TABLE consumables ADD COLUMN IF NOT EXISTS returnable TINYINT(1) DEFAULT 1")
         except mysql.connector.Error:
             pass
+        # Composite indexes backing keyset pagination of the catalogue
+        for index_sql in (
+            "CREATE INDEX idx_consumables_created_at_id ON consumables (created_at, id)",
+            "CREATE INDEX idx_consumables_category_created_at_id ON consumables (category, created_at, id)",
+            "CREATE FULLTEXT INDEX ft_consumables_search ON consumables (name, description, category)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except mysql.connector.Error:
+                pass
         
         # Create orders table
         cursor.execute("""
@@ -80,10 +455,24 @@ def init_database():
                 department VARCHAR(255) NOT NULL,
                 purpose TEXT NOT NULL,
                 date_needed DATE NOT NULL,
-                status ENUM('Pending', 'Approved', 'Rejected') DEFAULT 'Pending',
+                status ENUM('Pending', 'Approved', 'Rejected', 'Expired') DEFAULT 'Pending',
+                stock_reserved TINYINT(1) DEFAULT 0,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Stock reservation support on legacy deployments
+        try:
+            cursor.execute("ALTER TABLE orders ADD COLUMN IF NOT EXISTS stock_reserved TINYINT(1) DEFAULT 0")
+        except mysql.connector.Error:
+            pass
+        try:
+            cursor.execute("ALTER TABLE orders MODIFY COLUMN status ENUM('Pending','Approved','Rejected','Expired') DEFAULT 'Pending'")
+        except mysql.connector.Error:
+            pass
+        try:
+            cursor.execute("CREATE INDEX idx_orders_status_created_at ON orders (status, created_at)")
+        except mysql.connector.Error:
+            pass
         
         # Create order_items table
         cursor.execute("""
@@ -96,6 +485,29 @@ def init_database():
                 FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE
             )
         """)
+        # Server-side carts: the session only carries the cart id and its line count
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS carts (
+                id CHAR(32) PRIMARY KEY,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                INDEX idx_carts_updated_at (updated_at)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS cart_items (
+                cart_id CHAR(32) NOT NULL,
+                consumable_id INT NOT NULL,
+                quantity INT NOT NULL,
+                PRIMARY KEY (cart_id, consumable_id),
+                FOREIGN KEY (cart_id) REFERENCES carts(id) ON DELETE CASCADE,
+                FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE
+            )
+        """)
+        try:
+            cursor.execute("CREATE FULLTEXT INDEX ft_orders_search ON orders (user_name, department)")
+        except mysql.connector.Error:
+            pass
 
         # Create consumable borrow and return tables
         cursor.execute("""
@@ -121,6 +533,39 @@ def init_database():
                 FOREIGN KEY (borrow_id) REFERENCES consumable_borrows(id) ON DELETE CASCADE
             )
         """)
+        # Denormalized outstanding borrow quantity; backfill from history when first added
+        cursor.execute("SHOW COLUMNS FROM consumables LIKE 'borrowed'")
+        if not cursor.fetchall():
+            cursor.execute("ALTER TABLE consumables ADD COLUMN borrowed INT NOT NULL DEFAULT 0")
+            cursor.execute(_REBUILD_BORROWED_SQL)
+        
+        # Per-table change counters behind HTTP ETags and cross-process cache invalidation
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS table_versions (
+                table_name VARCHAR(64) PRIMARY KEY,
+                version BIGINT UNSIGNED NOT NULL DEFAULT 0
+            )
+        """)
+
+        # Create dashboard_stats summary table (single row, id = 1)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS dashboard_stats (
+                id TINYINT PRIMARY KEY,
+                total_items INT NOT NULL DEFAULT 0,
+                total_orders INT NOT NULL DEFAULT 0,
+                pending_orders INT NOT NULL DEFAULT 0,
+                low_stock INT NOT NULL DEFAULT 0,
+                refreshed_at TIMESTAMP NULL
+            )
+        """)
+        try:
+            cursor.execute("CREATE INDEX idx_orders_created_at ON orders (created_at)")
+        except mysql.connector.Error:
+            pass
+        try:
+            cursor.execute("CREATE INDEX idx_consumables_quantity ON consumables (quantity)")
+        except mysql.connector.Error:
+            pass
         
         # Create admin_users table
         cursor.execute("""
@@ -142,6 +587,16 @@ def init_database():
                 timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         """)
+        # Keyset pages of the audit viewer, unfiltered or filtered by admin or action
+        for index_sql in (
+            "CREATE INDEX idx_audit_logs_timestamp_id ON audit_logs (timestamp, id)",
+            "CREATE INDEX idx_audit_logs_admin_timestamp_id ON audit_logs (admin_username, timestamp, id)",
+            "CREATE INDEX idx_audit_logs_action_timestamp_id ON audit_logs (action, timestamp, id)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except mysql.connector.Error:
+                pass
 
         # Create laboratory table
         cursor.execute("""
@@ -188,6 +643,30 @@ def init_database():
                 cursor.execute("UPDATE lab_assets SET stock_date = purchase_date WHERE stock_date IS NULL")
             except mysql.connector.Error:
                 pass
+        try:
+            cursor.execute("CREATE FULLTEXT INDEX ft_lab_assets_search ON lab_assets (name, asset_code, description)")
+        except mysql.connector.Error:
+            pass
+        # Composite indexes backing cross-lab asset search: each filter column, then the keyset order
+        for index_sql in (
+            "CREATE INDEX idx_lab_assets_created_at_id ON lab_assets (created_at, id)",
+            "CREATE INDEX idx_lab_assets_lab_created_at_id ON lab_assets (lab_id, created_at, id)",
+            "CREATE INDEX idx_lab_assets_category_created_at_id ON lab_assets (category, created_at, id)",
+            "CREATE INDEX idx_lab_assets_status_created_at_id ON lab_assets (status, created_at, id)",
+            "CREATE INDEX idx_lab_assets_stock_date ON lab_assets (stock_date)",
+            "CREATE INDEX idx_lab_assets_asset_code ON lab_assets (asset_code)",
+        ):
+            try:
+                cursor.execute(index_sql)
+            except mysql.connector.Error:
+                pass
+        # Asset codes are unique per lab (NULL codes are allowed to repeat); imports refuse to run without it
+        if not _has_asset_code_index(cursor):
+            try:
+                cursor.execute("ALTER TABLE lab_assets ADD UNIQUE INDEX uq_lab_assets_lab_code (lab_id, asset_code)")
+            except mysql.connector.Error as err:
+                logger.warning(f"Could not add unique (lab_id, asset_code) index; asset imports are disabled "
+                               f"until duplicate asset codes are resolved: {err}")
         
         # Create asset_categories table
         cursor.execute("""
@@ -253,26 +732,477 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+AUDIT_COLUMNS = ('admin_username', 'action', 'details', 'timestamp')
+
+
+class AuditWriter:
+    """Buffers audit entries in memory and writes them from a background thread.
+
+    Requests only append to a deque; the writer thread flushes everything
+    waiting with multi-row INSERTs once `batch_size` entries are queued or
+    `interval` seconds have passed. A batch the database cannot take is
+    appended to a JSON-lines spool file and replayed after the next
+    successful flush. close() (registered with atexit) drains the buffer.
+    """
+
+    def __init__(self, spool_path, batch_size=100, interval=1.0):
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._closed = False
+        self._retry_at = 0.0
+        self._stats = {'queued': 0, 'written': 0, 'spooled': 0, 'replayed': 0, 'flushes': 0}
+
+    def enqueue(self, rows):
+        """Queue (admin_username, action, details, timestamp) rows"""
+        with self._cond:
+            self._pending.extend(rows)
+            self._stats['queued'] += len(rows)
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                self._ensure_thread()
+                if len(self._pending) >= self.batch_size:
+                    self._cond.notify()
+        if closed:
+            # Shutting down: nobody is left to flush later
+            self.flush()
+
+    def _ensure_thread(self):
+        # A forked worker inherits the object but not the thread
+        if self._thread is None or self._pid != os.getpid() or not self._thread.is_alive():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Audit writer flush failed")
+
+    def flush(self):
+        """Write every buffered entry now (and replay the spool); returns rows written"""
+        with self._flush_lock:
+            with self._cond:
+                rows = list(self._pending)
+                self._pending.clear()
+            # With nothing new to write, retry an unreachable database only now and then
+            if not rows and (time.monotonic() < self._retry_at or not os.path.exists(self.spool_path)):
+                return 0
+
+            # Always a connection of its own: a request-bound one may hold uncommitted work
+            try:
+                connection = db_pool.acquire()
+            except mysql.connector.Error as err:
+                logger.error(f"Audit log error: {err}")
+                self._spool(rows)
+                return 0
+            cursor = connection.cursor()
+            try:
+                if rows:
+                    _insert_many(cursor, 'audit_logs', AUDIT_COLUMNS, rows)
+                    connection.commit()
+                    self._stats['written'] += len(rows)
+                    self._stats['flushes'] += 1
+                self._replay_spool(cursor, connection)
+            except mysql.connector.Error as err:
+                logger.error(f"Audit log error: {err}")
+                self._spool(rows)
+                return 0
+            finally:
+                cursor.close()
+                connection.release()
+            return len(rows)
+
+    def _spool(self, rows):
+        if not rows:
+            return
+        try:
+            with open(self.spool_path, 'a', encoding='utf-8') as spool:
+                for username, action, details, stamp in rows:
+                    spool.write(json.dumps([username, action, details, stamp.isoformat()]) + '\n')
+                spool.flush()
+                os.fsync(spool.fileno())
+        except OSError as err:
+            logger.error(f"Audit spool error ({err}); dropping entries: {rows!r}")
+            return
+        self._stats['spooled'] += len(rows)
+        self._retry_at = time.monotonic() + 30
+        logger.warning(f"Audit log unavailable; spooled {len(rows)} entries to {self.spool_path}")
+
+    def _replay_spool(self, cursor, connection):
+        # Claim the spool by renaming it so concurrent writers start a fresh one
+        replay_path = f"{self.spool_path}.{os.getpid()}.replay"
+        try:
+            os.replace(self.spool_path, replay_path)
+        except FileNotFoundError:
+            return
+        rows = []
+        with open(replay_path, encoding='utf-8') as spool:
+            for line in spool:
+                try:
+                    username, action, details, stamp = json.loads(line)
+                    rows.append((username, action, details, datetime.fromisoformat(stamp)))
+                except ValueError:
+                    logger.warning(f"Skipping unreadable audit spool line: {line!r}")
+        try:
+            _insert_many(cursor, 'audit_logs', AUDIT_COLUMNS, rows)
+            connection.commit()
+            self._stats['replayed'] += len(rows)
+            logger.info(f"Replayed {len(rows)} spooled audit entries")
+        except mysql.connector.Error as err:
+            logger.error(f"Audit spool replay error: {err}")
+            self._spool(rows)
+        os.remove(replay_path)
+
+    def close(self):
+        """Stop the writer thread and flush what is left"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread if self._pid == os.getpid() else None
+        if thread:
+            thread.join(timeout=self.interval + 5)
+        self.flush()
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, pending=len(self._pending))
+
+
+audit_writer = AuditWriter(AUDIT_SPOOL_FILE, AUDIT_BATCH_SIZE, AUDIT_FLUSH_SECONDS)
+atexit.register(audit_writer.close)
+
+
 def log_admin_action(action, details):
     """Log admin actions for audit trail"""
+    log_admin_actions([(action, details)])
+
+def log_admin_actions(entries, username=None):
+    """Queue (action, details) audit entries for the batched audit writer.
+
+    Entries are stamped now and written by a background thread. Pass
+    `username` when there is no request session (background jobs).
+    """
+    if not entries:
+        return
+    if username is None:
+        username = session.get('admin_username')
+    now = datetime.now()
+    audit_writer.enqueue([(username, action, details, now) for action, details in entries])
+
+_SEARCH_TERM_RE = re.compile(r'(-?)"([^"]*)"|(-?)([^\s"]+)')
+_SEARCH_WORD_RE = re.compile(r'\w+')
+
+
+def _parse_search_terms(text):
+    """Split free text into (boolean expression, short terms, excluded short terms).
+
+    Words and phrases made only of words shorter than FULLTEXT_MIN_TOKEN
+    are not in the FULLTEXT index; they are returned separately so the
+    caller can still apply them, instead of silently widening the match.
+    """
+    terms = []
+    short = []
+    short_excluded = []
+    for match in _SEARCH_TERM_RE.finditer(text or ''):
+        if match.group(2) is not None:
+            words = _SEARCH_WORD_RE.findall(match.group(2))
+            if any(len(w) >= FULLTEXT_MIN_TOKEN for w in words):
+                op = '-' if match.group(1) else '+'
+                terms.append(f'{op}"{" ".join(words)}"')
+            elif words:
+                (short_excluded if match.group(1) else short).append(' '.join(words))
+            continue
+        excluded = bool(match.group(3))
+        for word in _SEARCH_WORD_RE.findall(match.group(4)):
+            if len(word) >= FULLTEXT_MIN_TOKEN:
+                terms.append(f'-{word}' if excluded else f'+{word}*')
+            else:
+                (short_excluded if excluded else short).append(word)
+    if not any(t.startswith('+') for t in terms):
+        return '', short, short_excluded
+    return ' '.join(terms), short, short_excluded
+
+
+def parse_search_query(text):
+    """Translate free text into a MySQL FULLTEXT BOOLEAN MODE expression.
+
+    Every word becomes a required prefix term (``lapt`` -> ``+lapt*``),
+    "quoted phrases" must match exactly and a leading ``-`` excludes a
+    word or phrase. Words shorter than FULLTEXT_MIN_TOKEN are left out
+    (_search_clause applies them with LIKE). Returns '' when nothing
+    indexable remains.
+    """
+    return _parse_search_terms(text)[0]
+
+
+def _search_clause(text, columns, alias=''):
+    """Build a search predicate over a FULLTEXT-indexed column list.
+
+    Returns (where_sql, where_params, rank_sql, rank_params); rank_sql is
+    None when the text has no indexable words and the predicate falls back
+    to LIKE matching. Words too short for the index are ANDed with the
+    MATCH as substring conditions (any column for required words, no
+    column for excluded ones), so "PC lab" still requires "PC".
+    """
+    prefix = f'{alias}.' if alias else ''
+    expr, short, short_excluded = _parse_search_terms(text)
+    if expr:
+        match = f"MATCH({', '.join(prefix + c for c in columns)}) AGAINST (%s IN BOOLEAN MODE)"
+        where = [match]
+        params = [expr]
+        for term, negate in [(t, False) for t in short] + [(t, True) for t in short_excluded]:
+            like = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            any_column = ' OR '.join(f"COALESCE({prefix}{c}, '') LIKE %s" for c in columns)
+            where.append(f"NOT ({any_column})" if negate else f"({any_column})")
+            params.extend([like] * len(columns))
+        if len(where) > 1:
+            return '(' + ' AND '.join(where) + ')', params, match, [expr]
+        return match, params, match, [expr]
+    like = f'%{text}%'
+    where = '(' + ' OR '.join(f'{prefix}{c} LIKE %s' for c in columns) + ')'
+    return where, [like] * len(columns), None, []
+
+
+class QueryCache:
+    """In-process read-through LRU cache with per-entry TTL and hit/miss counters.
+
+    Entries are keyed by (namespace, key). Writers call invalidate() with
+    the namespaces their change affects, after committing. A load that
+    overlaps an invalidation of its namespace is returned but not stored,
+    so a value read before the write cannot outlive it. Each process has
+    its own cache; TTLs bound how long other workers can serve old data.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def _count(self, namespace, outcome):
+        counters = self._stats.setdefault(namespace, {'hits': 0, 'misses': 0, 'invalidations': 0})
+        counters[outcome] += 1
+
+    def get_or_load(self, namespace, key, loader, ttl=None):
+        """Return the cached value, or call loader() and cache its result"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((namespace, key))
+            if entry and entry[1] > now:
+                self._entries.move_to_end((namespace, key))
+                self._count(namespace, 'hits')
+                return entry[0]
+            self._count(namespace, 'misses')
+            generation = self._generations.get(namespace, 0)
+
+        value = loader()
+
+        with self._lock:
+            if self._generations.get(namespace, 0) == generation:
+                self._entries[(namespace, key)] = (value, now + (self.ttl if ttl is None else ttl))
+                self._entries.move_to_end((namespace, key))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, *namespaces):
+        """Drop every entry of the given namespaces"""
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+                self._count(namespace, 'invalidations')
+            for cache_key in [k for k in self._entries if k[0] in namespaces]:
+                del self._entries[cache_key]
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'namespaces': {ns: dict(c) for ns, c in self._stats.items()}}
+
+
+query_cache = QueryCache(QUERY_CACHE_SIZE, QUERY_CACHE_TTL)
+
+
+def _encode_cursor(created_at, row_id):
+    """Encode a (created_at, id) seek position as an opaque URL-safe token"""
+    raw = f"{created_at.isoformat()}|{row_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def _decode_cursor(token):
+    """Decode a seek token back to (created_at, id); returns None if invalid"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode('utf-8').split('|')
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+# Query cache namespaces derived from each versioned table
+TABLE_CACHE_NAMESPACES = {
+    'consumables': ('catalogue_count', 'catalogue_page', 'consumable_categories'),
+    'asset_categories': ('asset_categories',),
+}
+_seen_table_versions = {}
+
+
+def bump_table_versions(cursor, *tables):
+    """Advance the change counters of `tables` inside the caller's write transaction.
+
+    Call it on the writing cursor before commit: the counters then move
+    exactly when the write becomes visible, and a failed bump fails the write.
+    """
+    cursor.execute(
+        "INSERT INTO table_versions (table_name, version) VALUES "
+        + ', '.join(['(%s, 1)'] * len(tables))
+        + " ON DUPLICATE KEY UPDATE version = version + 1",
+        list(tables),
+    )
+
+
+def get_table_versions(cursor, tables):
+    """Current change counters of `tables` ({name: version}, 0 if never written).
+
+    A counter that moved since this process last looked means another
+    process wrote the table, so the matching query cache namespaces are dropped.
+    """
+    cursor.execute(
+        f"SELECT table_name, version FROM table_versions WHERE table_name IN ({','.join(['%s'] * len(tables))})",
+        list(tables),
+    )
+    versions = dict.fromkeys(tables, 0)
+    versions.update((name, int(version)) for name, version in cursor.fetchall())
+    stale = []
+    for table, version in versions.items():
+        if _seen_table_versions.get(table) != version:
+            _seen_table_versions[table] = version
+            stale.extend(TABLE_CACHE_NAMESPACES.get(table, ()))
+    if stale:
+        query_cache.invalidate(*stale)
+    return versions
+
+
+def _invalidate_catalogue():
+    """Drop cached catalogue pages, totals and categories after consumables or their stock change"""
+    query_cache.invalidate(*TABLE_CACHE_NAMESPACES['consumables'])
+
+
+def _invalidate_asset_categories():
+    """Drop the cached asset category list after a category is added"""
+    query_cache.invalidate(*TABLE_CACHE_NAMESPACES['asset_categories'])
+
+
+# Salt for page ETags so a deploy with new code or templates invalidates revalidated pages
+_ETAG_BUILD = str(max(
+    [os.path.getmtime(__file__)] + [
+        os.path.getmtime(os.path.join(root, name))
+        for root, _, names in os.walk(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates'))
+        for name in names
+    ]
+))
+
+
+def _page_etag(tables):
+    """Strong ETag for the current GET, or None when the page must be rendered"""
+    if '_flashes' in session:
+        return None
     connection = get_db_connection()
-    if connection:
-        cursor = connection.cursor()
-        try:
+    if not connection:
+        return None
+    cursor = connection.cursor()
+    try:
+        versions = get_table_versions(cursor, tables)
+    except mysql.connector.Error as err:
+        logger.error(f"Table version error: {err}")
+        return None
+    finally:
+        cursor.close()
+    state = {key: value for key, value in session.items() if key != '_flashes'}
+    csrf_window = int(time.time() // max(app.config['WTF_CSRF_TIME_LIMIT'] // 2, 1))
+    raw = json.dumps([_ETAG_BUILD, request.full_path, sorted(versions.items()), state, csrf_window],
+                     sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+def conditional_page(*tables):
+    """Decorator answering GETs with 304 Not Modified while `tables` are unchanged.
+
+    The ETag covers the tables' change counters, the URL and the session
+    (login, cart, CSRF secret), and rolls over every half CSRF lifetime so
+    a revalidated page never carries an expired token. Pages with pending
+    flash messages are always rendered.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            etag = _page_etag(tables)
+            if etag and request.if_none_match.contains(etag):
+                response = app.response_class(status=304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if not etag or response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+
+def _consumable_categories(cursor):
+    def load():
+        cursor.execute("SELECT DISTINCT category FROM consumables ORDER BY category")
+        return [row['category'] for row in cursor.fetchall()]
+    return query_cache.get_or_load('consumable_categories', None, load)
+
+
+def _asset_categories(cursor):
+    def load():
+        cursor.execute("SELECT name FROM asset_categories ORDER BY name ASC")
+        return [row['name'] for row in cursor.fetchall()]
+    return query_cache.get_or_load('asset_categories', None, load)
+
+
+def _catalogue_total(cursor, where, params, search, category):
+    """Total consumables matching the filters, cached for CATALOGUE_COUNT_TTL seconds"""
+    def load():
+        if CATALOGUE_APPROX_COUNT and not search and not category:
             cursor.execute("""
-                INSERT INTO audit_logs (admin_username, action, details) 
-                VALUES (%s, %s, %s)
-            """, (session.get('admin_username'), action, details))
-            connection.commit()
-        except mysql.connector.Error as err:
-            logger.error(f"Audit log error: {err}")
-        finally:
-            cursor.close()
-            connection.close()
+                SELECT TABLE_ROWS AS total FROM information_schema.TABLES
+                WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'consumables'
+            """, (DB_CONFIG['database'],))
+            row = cursor.fetchone()
+            return int(row['total'] or 0) if row else 0
+        cursor.execute(f"SELECT COUNT(*) AS total FROM consumables WHERE {where}", params)
+        return cursor.fetchone()['total']
+    return query_cache.get_or_load('catalogue_count', (search, category), load, CATALOGUE_COUNT_TTL)
+
 
 @app.route('/')
+@conditional_page('consumables')
 def index():
-    """Public home page with consumables listing"""
+    """Public home page with consumables listing.
+
+    Supports offset pages (?page=) and keyset pages (?after= / ?before=
+    cursor tokens on created_at, id); Next/Previous links always use cursors.
+    """
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
@@ -283,36 +1213,69 @@ def index():
     # Get search and filter parameters
     search = request.args.get('search', '')
     category = request.args.get('category', '')
-    page = request.args.get('page', 1, type=int)
+    page = max(request.args.get('page', 1, type=int), 1)
+    after = _decode_cursor(request.args.get('after', ''))
+    before = None if after else _decode_cursor(request.args.get('before', ''))
     per_page = 12
     
-    # Build query with filters
-    query = "SELECT * FROM consumables WHERE 1=1"
+    # Build filters
+    where = "1=1"
     params = []
     
+    rank_sql = None
     if search:
-        query += " AND (name LIKE %s OR description LIKE %s)"
-        params.extend([f'%{search}%', f'%{search}%'])
+        search_sql, search_params, rank_sql, rank_params = _search_clause(search, CONSUMABLE_SEARCH_COLUMNS)
+        where += f" AND {search_sql}"
+        params.extend(search_params)
     
     if category:
-        query += " AND category = %s"
+        where += " AND category = %s"
         params.append(category)
     
-    # Get total count for pagination
-    count_query = query.replace("SELECT *", "SELECT COUNT(*)")
-    cursor.execute(count_query, params)
-    total_items = cursor.fetchone()['COUNT(*)']
+    # Get (cached) total count for pagination
+    total_items = _catalogue_total(cursor, where, params, search, category)
     
-    # Add pagination
-    query += " ORDER BY created_at DESC LIMIT %s OFFSET %s"
-    params.extend([per_page, (page - 1) * per_page])
+    # Seek past the cursor instead of scanning and discarding earlier rows;
+    # ranked search results are ordered by relevance and paged by offset
+    query = f"SELECT * FROM consumables WHERE {where}"
+    query_params = list(params)
+    if rank_sql:
+        after = before = None
+        query = f"SELECT *, {rank_sql} AS relevance FROM consumables WHERE {where}"
+        query += " ORDER BY relevance DESC, created_at DESC, id DESC LIMIT %s OFFSET %s"
+        query_params = rank_params + params + [per_page + 1, (page - 1) * per_page]
+    elif after:
+        query += " AND (created_at < %s OR (created_at = %s AND id < %s))"
+        query += " ORDER BY created_at DESC, id DESC LIMIT %s"
+        query_params.extend([after[0], after[0], after[1], per_page + 1])
+    elif before:
+        query += " AND (created_at > %s OR (created_at = %s AND id > %s))"
+        query += " ORDER BY created_at ASC, id ASC LIMIT %s"
+        query_params.extend([before[0], before[0], before[1], per_page + 1])
+    else:
+        query += " ORDER BY created_at DESC, id DESC LIMIT %s OFFSET %s"
+        query_params.extend([per_page + 1, (page - 1) * per_page])
     
-    cursor.execute(query, params)
-    consumables = cursor.fetchall()
+    def load_page():
+        cursor.execute(query, query_params)
+        return cursor.fetchall()
+    rows = query_cache.get_or_load('catalogue_page', (query, tuple(query_params)), load_page, CATALOGUE_PAGE_TTL)
+    has_more = len(rows) > per_page
+    consumables = rows[:per_page]
+    if before:
+        consumables.reverse()
+        if not has_more:
+            page = 1
+    
+    next_cursor = prev_cursor = None
+    if consumables and not rank_sql:
+        if has_more or before:
+            next_cursor = _encode_cursor(consumables[-1]['created_at'], consumables[-1]['id'])
+        if (has_more if before else (after or page > 1)):
+            prev_cursor = _encode_cursor(consumables[0]['created_at'], consumables[0]['id'])
     
     # Get unique categories for filter
-    cursor.execute("SELECT DISTINCT category FROM consumables ORDER BY category")
-    categories = [row['category'] for row in cursor.fetchall()]
+    categories = _consumable_categories(cursor)
     
     cursor.close()
     connection.close()
@@ -325,75 +1288,389 @@ def index():
                          search=search,
                          category=category,
                          page=page,
-                         total_pages=total_pages)
+                         total_pages=total_pages,
+                         cursor_mode=bool(after or before),
+                         has_next=has_more,
+                         next_cursor=next_cursor,
+                         prev_cursor=prev_cursor)
+
+def _touch_cart(cursor, cart_id):
+    cursor.execute(
+        "INSERT INTO carts (id) VALUES (%s) ON DUPLICATE KEY UPDATE updated_at = CURRENT_TIMESTAMP", (cart_id,)
+    )
 
-@app.route('/add_to_cart', methods=['POST'])
-def add_to_cart():
-    """Add item to cart (session-based)"""
-    if 'cart' not in session:
-        session['cart'] = {}
-    
-    consumable_id = request.form.get('consumable_id')
-    quantity = int(request.form.get('quantity', 1))
-    
-    if consumable_id in session['cart']:
-        session['cart'][consumable_id] += quantity
-    else:
-        session['cart'][consumable_id] = quantity
-    
-    session.modified = True
-    flash('Item added to cart successfully!', 'success')
-    return redirect(url_for('index'))
 
-@app.route('/cart')
-def cart():
-    """View cart contents"""
-    if 'cart' not in session or not session['cart']:
-        flash('Your cart is empty', 'info')
-        return redirect(url_for('index'))
-    
-    connection = get_db_connection()
-    if not connection:
-        flash('Database connection error', 'error')
-        return redirect(url_for('index'))
-    
-    cursor = connection.cursor(dictionary=True)
-    cart_items = []
-    total = 0
-    
-    for consumable_id, quantity in session['cart'].items():
-        cursor.execute("SELECT * FROM consumables WHERE id = %s", (consumable_id,))
-        item = cursor.fetchone()
-        if item:
-            item['cart_quantity'] = quantity
-            cart_items.append(item)
-            total += quantity
-    
-    cursor.close()
-    connection.close()
-    
-    return render_template('cart.html', cart_items=cart_items, total=total)
+def add_cart_item(cursor, cart_id, consumable_id, quantity):
+    """Add quantity of one item to a cart; returns True if it started a new line"""
+    _touch_cart(cursor, cart_id)
+    cursor.execute("""
+        INSERT INTO cart_items (cart_id, consumable_id, quantity) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)
+    """, (cart_id, consumable_id, quantity))
+    return cursor.rowcount == 1
 
-@app.route('/update_cart', methods=['POST'])
-def update_cart():
-    """Update cart quantities"""
-    consumable_id = request.form.get('consumable_id')
-    quantity = int(request.form.get('quantity', 0))
-    
+
+def set_cart_item(cursor, cart_id, consumable_id, quantity):
+    """Set one line's quantity (removing it when <= 0); returns the change in line count"""
+    _touch_cart(cursor, cart_id)
     if quantity <= 0:
-        session['cart'].pop(consumable_id, None)
-    else:
-        session['cart'][consumable_id] = quantity
-    
-    session.modified = True
-    flash('Cart updated successfully!', 'success')
-    return redirect(url_for('cart'))
+        cursor.execute("DELETE FROM cart_items WHERE cart_id = %s AND consumable_id = %s", (cart_id, consumable_id))
+        return -cursor.rowcount
+    cursor.execute("""
+        INSERT INTO cart_items (cart_id, consumable_id, quantity) VALUES (%s, %s, %s)
+        ON DUPLICATE KEY UPDATE quantity = VALUES(quantity)
+    """, (cart_id, consumable_id, quantity))
+    return 1 if cursor.rowcount == 1 else 0
+
+
+def merge_cart(cursor, cart_id, lines):
+    """Add {consumable_id: quantity} lines into a cart in one statement, summing shared items"""
+    rows = [(cart_id, consumable_id, quantity) for consumable_id, quantity in lines.items() if quantity > 0]
+    if not rows:
+        return
+    _touch_cart(cursor, cart_id)
+    cursor.execute(
+        "INSERT INTO cart_items (cart_id, consumable_id, quantity) VALUES "
+        + ', '.join(['(%s, %s, %s)'] * len(rows))
+        + " ON DUPLICATE KEY UPDATE quantity = quantity + VALUES(quantity)",
+        [value for row in rows for value in row],
+    )
+
+
+def get_cart(cursor, cart_id):
+    """A cart's lines as {consumable_id: quantity}"""
+    cursor.execute("SELECT consumable_id, quantity FROM cart_items WHERE cart_id = %s", (cart_id,))
+    return {row[0]: row[1] for row in cursor.fetchall()}
+
+
+def clear_cart(cursor, cart_id):
+    """Delete a cart and (by cascade) its lines"""
+    cursor.execute("DELETE FROM carts WHERE id = %s", (cart_id,))
+
+
+def _session_cart(connection, create=False):
+    """Resolve the session's live cart id, moving a legacy cookie cart into it.
+
+    Expired carts are deleted and forgotten. Returns None when the session
+    has no cart and create is False.
+    """
+    cart_id = session.get('cart_id')
+    legacy = session.get('cart')
+    cursor = connection.cursor()
+    try:
+        if cart_id:
+            cursor.execute("SELECT updated_at >= NOW() - INTERVAL %s HOUR FROM carts WHERE id = %s",
+                           (CART_TTL_HOURS, cart_id))
+            row = cursor.fetchone()
+            if not row or not row[0]:
+                if row:
+                    clear_cart(cursor, cart_id)
+                    connection.commit()
+                cart_id = None
+                session.pop('cart_id', None)
+                session.pop('cart_count', None)
+        if not cart_id and (create or legacy):
+            cart_id = session['cart_id'] = uuid.uuid4().hex
+        if legacy is not None:
+            lines = {}
+            for consumable_id, quantity in legacy.items():
+                try:
+                    lines[int(consumable_id)] = int(quantity)
+                except (TypeError, ValueError):
+                    continue
+            if lines:
+                merge_cart(cursor, cart_id, lines)
+                connection.commit()
+            session.pop('cart', None)
+            if cart_id:
+                session['cart_count'] = len(get_cart(cursor, cart_id))
+        return cart_id
+    finally:
+        cursor.close()
+
+
+@app.route('/add_to_cart', methods=['POST'])
+def add_to_cart():
+    """Add item to the session's server-side cart"""
+    try:
+        consumable_id = int(request.form.get('consumable_id'))
+        quantity = int(request.form.get('quantity', 1))
+    except (TypeError, ValueError):
+        flash('Invalid item or quantity', 'error')
+        return redirect(url_for('index'))
+    if quantity <= 0:
+        flash('Invalid item or quantity', 'error')
+        return redirect(url_for('index'))
+
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(url_for('index'))
+
+    cursor = connection.cursor()
+    try:
+        cart_id = _session_cart(connection, create=True)
+        new_line = add_cart_item(cursor, cart_id, consumable_id, quantity)
+        connection.commit()
+    except mysql.connector.Error as err:
+        connection.rollback()
+        logger.error(f"Add to cart error: {err}")
+        flash('Error adding item to cart', 'error')
+        return redirect(url_for('index'))
+    finally:
+        cursor.close()
+        connection.close()
+
+    if new_line:
+        session['cart_count'] = session.get('cart_count', 0) + 1
+    flash('Item added to cart successfully!', 'success')
+    return redirect(url_for('index'))
+
+def _load_cart(cursor, cart):
+    """Resolve cart lines with a single IN() query and check stock in the same pass.
+
+    Returns (cart_items, total, shortages); shortages are items whose
+    requested quantity exceeds current stock.
+    """
+    quantities = {}
+    for consumable_id, quantity in cart.items():
+        try:
+            quantities[int(consumable_id)] = int(quantity)
+        except (TypeError, ValueError):
+            continue
+    if not quantities:
+        return [], 0, []
+
+    placeholders = ','.join(['%s'] * len(quantities))
+    cursor.execute(f"SELECT * FROM consumables WHERE id IN ({placeholders})", list(quantities))
+    found = {row['id']: row for row in cursor.fetchall()}
+
+    cart_items = []
+    shortages = []
+    total = 0
+    for consumable_id, quantity in quantities.items():
+        item = found.get(consumable_id)
+        if not item:
+            continue
+        item['cart_quantity'] = quantity
+        item['in_stock'] = item['quantity'] >= quantity
+        if not item['in_stock']:
+            shortages.append(item)
+        cart_items.append(item)
+        total += quantity
+    return cart_items, total, shortages
+
+
+@app.route('/cart')
+def cart():
+    """View cart contents"""
+    if not session.get('cart_id') and not session.get('cart'):
+        flash('Your cart is empty', 'info')
+        return redirect(url_for('index'))
+    
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(url_for('index'))
+    
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cart_id = _session_cart(connection)
+        lines = {}
+        if cart_id:
+            lines_cursor = connection.cursor()
+            try:
+                lines = get_cart(lines_cursor, cart_id)
+            finally:
+                lines_cursor.close()
+        session['cart_count'] = len(lines)
+        cart_items, total, shortages = _load_cart(cursor, lines)
+    except mysql.connector.Error as err:
+        logger.error(f"Cart error: {err}")
+        flash('Error loading cart', 'error')
+        return redirect(url_for('index'))
+    finally:
+        cursor.close()
+        connection.close()
+    
+    if not cart_items:
+        flash('Your cart is empty', 'info')
+        return redirect(url_for('index'))
+    if shortages:
+        flash('Not enough stock for: ' + ', '.join(f"{i['name']} ({i['quantity']} available)" for i in shortages), 'warning')
+    
+    return render_template('cart.html', cart_items=cart_items, total=total)
+
+@app.route('/update_cart', methods=['POST'])
+def update_cart():
+    """Update cart quantities"""
+    try:
+        consumable_id = int(request.form.get('consumable_id'))
+        quantity = int(request.form.get('quantity', 0))
+    except (TypeError, ValueError):
+        flash('Invalid item or quantity', 'error')
+        return redirect(url_for('cart'))
+
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(url_for('cart'))
+
+    cursor = connection.cursor()
+    try:
+        cart_id = _session_cart(connection, create=True)
+        delta = set_cart_item(cursor, cart_id, consumable_id, quantity)
+        connection.commit()
+    except mysql.connector.Error as err:
+        connection.rollback()
+        logger.error(f"Update cart error: {err}")
+        flash('Error updating cart', 'error')
+        return redirect(url_for('cart'))
+    finally:
+        cursor.close()
+        connection.close()
+
+    session['cart_count'] = max(session.get('cart_count', 0) + delta, 0)
+    flash('Cart updated successfully!', 'success')
+    return redirect(url_for('cart'))
+
+
+def gc_carts(connection, ttl_hours=None):
+    """Delete carts unchanged for ttl_hours (default CART_TTL_HOURS) in small batches; returns the count"""
+    ttl_hours = CART_TTL_HOURS if ttl_hours is None else ttl_hours
+    cursor = connection.cursor()
+    removed = 0
+    try:
+        while True:
+            cursor.execute("DELETE FROM carts WHERE updated_at < NOW() - INTERVAL %s HOUR LIMIT 1000", (ttl_hours,))
+            connection.commit()
+            removed += cursor.rowcount
+            if cursor.rowcount < 1000:
+                return removed
+    finally:
+        cursor.close()
+
+
+@app.cli.command('gc-carts')
+@click.option('--ttl-hours', type=int, default=None, help='Override CART_TTL_HOURS')
+def gc_carts_command(ttl_hours):
+    """Remove abandoned server-side carts"""
+    connection = get_db_connection()
+    if not connection:
+        raise click.ClickException('Database connection error')
+    click.echo(f"Removed {gc_carts(connection, ttl_hours)} expired cart(s)")
+
+
+def _insert_many(cursor, table, columns, rows, chunk_size=1000, ignore=False, update_columns=None):
+    """Insert rows using multi-row INSERT statements of up to chunk_size rows each.
+
+    With ignore=True rows hitting a unique key are left as they are (ON
+    DUPLICATE KEY UPDATE id = id, so the table needs an `id` column); unlike
+    INSERT IGNORE this still raises on foreign key, enum and truncation
+    errors. With update_columns they overwrite those columns instead.
+    Returns the summed affected-row count: 1 per inserted row, plus 2 per row
+    changed by an update and 0 per row left as it was.
+    """
+    placeholder = '(' + ', '.join(['%s'] * len(columns)) + ')'
+    suffix = ''
+    if update_columns:
+        # VALUES() rather than the row alias syntax so MariaDB accepts it
+        suffix = ' ON DUPLICATE KEY UPDATE ' + ', '.join(f"{column} = VALUES({column})" for column in update_columns)
+    elif ignore:
+        suffix = ' ON DUPLICATE KEY UPDATE id = id'
+    affected = 0
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES " + ', '.join([placeholder] * len(chunk)) + suffix,
+            [value for row in chunk for value in row],
+        )
+        affected += cursor.rowcount
+    return affected
+
+
+def _reserve_stock(cursor, quantities):
+    """Atomically deduct {consumable_id: quantity} from stock in one guarded UPDATE.
+
+    Returns True only if every line had enough stock; the caller must roll
+    back otherwise, since lines that did fit were already deducted.
+    """
+    lines = ' UNION ALL '.join(['SELECT %s AS id, %s AS qty'] * len(quantities))
+    cursor.execute(f"""
+        UPDATE consumables c
+        JOIN ({lines}) r ON r.id = c.id
+        SET c.quantity = c.quantity - r.qty
+        WHERE c.quantity >= r.qty
+    """, [v for item in quantities.items() for v in item])
+    return cursor.rowcount == len(quantities)
+
+
+def _release_order_stock(cursor, order_ids):
+    """Return the reserved stock of the given orders to inventory"""
+    placeholders = ','.join(['%s'] * len(order_ids))
+    cursor.execute(f"""
+        UPDATE consumables c
+        JOIN (
+            SELECT consumable_id, SUM(quantity) AS qty
+            FROM order_items
+            WHERE order_id IN ({placeholders})
+            GROUP BY consumable_id
+        ) r ON r.consumable_id = c.id
+        SET c.quantity = c.quantity + r.qty
+    """, list(order_ids))
+    cursor.execute(f"UPDATE orders SET stock_reserved = 0 WHERE id IN ({placeholders})", list(order_ids))
+
+
+def release_expired_reservations(connection):
+    """Expire pending orders older than ORDER_RESERVATION_TTL_HOURS and release their stock"""
+    if ORDER_RESERVATION_TTL_HOURS <= 0:
+        return 0
+    cursor = connection.cursor()
+    try:
+        cursor.execute("""
+            SELECT id FROM orders
+            WHERE status = 'Pending' AND stock_reserved = 1
+              AND created_at < NOW() - INTERVAL %s HOUR
+            FOR UPDATE
+        """, (ORDER_RESERVATION_TTL_HOURS,))
+        order_ids = [row[0] for row in cursor.fetchall()]
+        if order_ids:
+            _release_order_stock(cursor, order_ids)
+            placeholders = ','.join(['%s'] * len(order_ids))
+            cursor.execute(f"UPDATE orders SET status = 'Expired' WHERE id IN ({placeholders})", order_ids)
+            low_stock = _low_stock_delta(cursor, order_ids=order_ids, sign=1)
+            bump_dashboard_stats(cursor, pending_orders=-len(order_ids), low_stock=low_stock)
+            bump_table_versions(cursor, 'consumables')
+        connection.commit()
+        if order_ids:
+            _invalidate_catalogue()
+            logger.info(f"Expired {len(order_ids)} pending order(s) and released their stock")
+            event_broker.publish('orders', {'changes': [
+                {'order_id': order_id, 'status': 'Expired', 'previous_status': 'Pending'} for order_id in order_ids]})
+            event_broker.publish('stock', {'reason': 'expiry', 'changes': [], 'low_stock': low_stock})
+        return len(order_ids)
+    except mysql.connector.Error as err:
+        connection.rollback()
+        logger.error(f"Reservation expiry error: {err}")
+        return 0
+    finally:
+        cursor.close()
+
+
+@app.cli.command('expire-reservations')
+def expire_reservations_command():
+    """Release stock held by pending orders past their reservation TTL"""
+    connection = get_db_connection()
+    if not connection:
+        raise click.ClickException('Database connection error')
+    click.echo(f"Expired {release_expired_reservations(connection)} order(s)")
+
 
 @app.route('/place_order', methods=['GET', 'POST'])
 def place_order():
     """Place order from cart"""
     if request.method == 'GET':
-        if 'cart' not in session or not session['cart']:
+        if not session.get('cart_count') and not session.get('cart'):
             flash('Your cart is empty', 'info')
             return redirect(url_for('index'))
         return render_template('place_order.html')
@@ -413,28 +1690,65 @@ def place_order():
         flash('Database connection error', 'error')
         return render_template('place_order.html')
     
+    try:
+        cart_id = _session_cart(connection)
+        cursor = connection.cursor()
+        try:
+            lines = get_cart(cursor, cart_id) if cart_id else {}
+        finally:
+            cursor.close()
+    except mysql.connector.Error as err:
+        logger.error(f"Cart error: {err}")
+        flash('Error loading cart', 'error')
+        return render_template('place_order.html')
+    quantities = {consumable_id: quantity for consumable_id, quantity in lines.items() if quantity > 0}
+    
+    if not quantities:
+        flash('Your cart is empty', 'info')
+        return redirect(url_for('index'))
+    
     cursor = connection.cursor()
     
     try:
         # Create order
         cursor.execute("""
-            INSERT INTO orders (user_name, department, purpose, date_needed) 
-            VALUES (%s, %s, %s, %s)
+            INSERT INTO orders (user_name, department, purpose, date_needed, stock_reserved) 
+            VALUES (%s, %s, %s, %s, 1)
         """, (user_name, department, purpose, date_needed))
         
         order_id = cursor.lastrowid
         
-        # Add order items
-        for consumable_id, quantity in session['cart'].items():
-            cursor.execute("""
-                INSERT INTO order_items (order_id, consumable_id, quantity) 
-                VALUES (%s, %s, %s)
-            """, (order_id, consumable_id, quantity))
+        # Reserve stock for every line in one guarded statement
+        if not _reserve_stock(cursor, quantities):
+            connection.rollback()
+            dict_cursor = connection.cursor(dictionary=True)
+            try:
+                cart_items, _, shortages = _load_cart(dict_cursor, quantities)
+            finally:
+                dict_cursor.close()
+            missing = len(quantities) - len(cart_items)
+            problems = [f"{i['name']} ({i['quantity']} available)" for i in shortages]
+            if missing:
+                problems.append(f"{missing} item(s) no longer available")
+            flash('Not enough stock to place this order: ' + ', '.join(problems), 'error')
+            return redirect(url_for('cart'))
         
-        connection.commit()
+        # Add order items in a single multi-row INSERT
+        _insert_many(cursor, 'order_items', ('order_id', 'consumable_id', 'quantity'),
+                     [(order_id, cid, qty) for cid, qty in quantities.items()])
         
-        # Clear cart
-        session.pop('cart', None)
+        # Clear cart in the same transaction as the order
+        clear_cart(cursor, cart_id)
+        low_stock = _low_stock_delta(cursor, {cid: -qty for cid, qty in quantities.items()})
+        bump_dashboard_stats(cursor, total_orders=1, pending_orders=1, low_stock=low_stock)
+        bump_table_versions(cursor, 'consumables')
+        connection.commit()
+        _invalidate_catalogue()
+        session.pop('cart_id', None)
+        session.pop('cart_count', None)
+        event_broker.publish('orders', {'changes': [{'order_id': order_id, 'status': 'Pending', 'previous_status': None}]})
+        event_broker.publish('stock', {'reason': 'order', 'low_stock': low_stock, 'changes': [
+            {'consumable_id': cid, 'delta': -qty} for cid, qty in quantities.items()]})
         
         flash('Order placed successfully! Your order ID is: ' + str(order_id), 'success')
         return redirect(url_for('index'))
@@ -488,6 +1802,111 @@ def admin_logout():
     flash('Logged out successfully', 'success')
     return redirect(url_for('admin_login'))
 
+def refresh_dashboard_stats(connection):
+    """Recompute the dashboard counters in one statement and store them in dashboard_stats"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT
+                (SELECT COUNT(*) FROM consumables) AS total_items,
+                (SELECT COUNT(*) FROM orders) AS total_orders,
+                (SELECT COUNT(*) FROM orders WHERE status = 'Pending') AS pending_orders,
+                (SELECT COUNT(*) FROM consumables WHERE quantity < %s) AS low_stock
+        """, (LOW_STOCK_THRESHOLD,))
+        stats = cursor.fetchone()
+        cursor.execute("""
+            INSERT INTO dashboard_stats (id, total_items, total_orders, pending_orders, low_stock, refreshed_at)
+            VALUES (1, %s, %s, %s, %s, NOW())
+            ON DUPLICATE KEY UPDATE
+                total_items = VALUES(total_items), total_orders = VALUES(total_orders),
+                pending_orders = VALUES(pending_orders), low_stock = VALUES(low_stock),
+                refreshed_at = VALUES(refreshed_at)
+        """, (stats['total_items'], stats['total_orders'], stats['pending_orders'], stats['low_stock']))
+        connection.commit()
+        stats['refreshed_at'] = datetime.now()
+        return stats
+    finally:
+        cursor.close()
+
+
+def get_dashboard_stats(connection):
+    """Dashboard counters from the summary table, refreshed when older than DASHBOARD_STATS_TTL"""
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute("""
+            SELECT total_items, total_orders, pending_orders, low_stock, refreshed_at,
+                   TIMESTAMPDIFF(SECOND, refreshed_at, NOW()) AS age
+            FROM dashboard_stats WHERE id = 1
+        """)
+        row = cursor.fetchone()
+    finally:
+        cursor.close()
+    if row and row['age'] is not None and row['age'] < DASHBOARD_STATS_TTL:
+        row.pop('age')
+        return row
+    return refresh_dashboard_stats(connection)
+
+
+def bump_dashboard_stats(cursor, total_orders=0, pending_orders=0, low_stock=0):
+    """Apply counter deltas to the summary row inside the caller's write transaction.
+
+    Keeps dashboard_stats current between full refreshes without recounting
+    on the write path; the scheduled refresh corrects any drift.
+    """
+    if total_orders or pending_orders or low_stock:
+        cursor.execute("""
+            UPDATE dashboard_stats
+            SET total_orders = total_orders + %s, pending_orders = pending_orders + %s, low_stock = low_stock + %s
+            WHERE id = 1
+        """, (total_orders, pending_orders, low_stock))
+
+
+def _low_stock_delta(cursor, deltas=None, order_ids=(), sign=1):
+    """Change in the number of low-stock consumables made by a stock write already applied in this transaction.
+
+    The moved quantities are either `deltas` ({consumable_id: change}) or
+    the items of `order_ids` times `sign` (+1 returned to stock, -1 deducted).
+    Only the touched consumables are read, by primary key.
+    """
+    if deltas:
+        moved = ' UNION ALL '.join(['SELECT %s AS consumable_id, %s AS qty'] * len(deltas))
+        params = [v for item in deltas.items() for v in item]
+        sign = 1
+    elif order_ids:
+        placeholders = ','.join(['%s'] * len(order_ids))
+        moved = (f"SELECT consumable_id, SUM(quantity) AS qty FROM order_items "
+                 f"WHERE order_id IN ({placeholders}) GROUP BY consumable_id")
+        params = list(order_ids)
+    else:
+        return 0
+    cursor.execute(f"""
+        SELECT COALESCE(SUM(c.quantity < %s) - SUM(c.quantity - %s * r.qty < %s), 0) AS delta
+        FROM consumables c
+        JOIN ({moved}) r ON r.consumable_id = c.id
+    """, [LOW_STOCK_THRESHOLD, sign, LOW_STOCK_THRESHOLD, *params])
+    row = cursor.fetchone()
+    return int(row['delta'] if isinstance(row, dict) else row[0])
+
+
+def _bump_dashboard_for_orders(cursor, results, sign):
+    """Apply the dashboard deltas of approve_orders()/reject_orders() results; returns the low_stock delta"""
+    moved = [order_id for order_id, r in results.items() if r.get('stock_moved')]
+    low_stock = _low_stock_delta(cursor, order_ids=moved, sign=sign)
+    pending = sum(1 for r in results.values() if r.get('status') and r['previous_status'] == 'Pending')
+    bump_dashboard_stats(cursor, pending_orders=-pending, low_stock=low_stock)
+    return low_stock
+
+
+@app.cli.command('refresh-stats')
+def refresh_stats_command():
+    """Recompute the dashboard summary counters (schedule from cron)"""
+    connection = get_db_connection()
+    if not connection:
+        raise click.ClickException('Database connection error')
+    stats = refresh_dashboard_stats(connection)
+    click.echo(', '.join(f"{key}={value}" for key, value in stats.items() if key != 'refreshed_at'))
+
+
 @app.route('/admin/dashboard')
 @admin_required
 def admin_dashboard():
@@ -497,27 +1916,18 @@ def admin_dashboard():
         flash('Database connection error', 'error')
         return render_template('admin/dashboard.html')
     
-    cursor = connection.cursor(dictionary=True)
-    
-    # Get statistics
-    cursor.execute("SELECT COUNT(*) as total_items FROM consumables")
-    total_items = cursor.fetchone()['total_items']
-    
-    cursor.execute("SELECT COUNT(*) as total_orders FROM orders")
-    total_orders = cursor.fetchone()['total_orders']
-    
-    cursor.execute("SELECT COUNT(*) as pending_orders FROM orders WHERE status = 'Pending'")
-    pending_orders = cursor.fetchone()['pending_orders']
+    try:
+        stats = get_dashboard_stats(connection)
+    except mysql.connector.Error as err:
+        logger.error(f"Dashboard stats error: {err}")
+        stats = {'total_items': 0, 'total_orders': 0, 'pending_orders': 0, 'low_stock': 0}
     
-    cursor.execute("SELECT COUNT(*) as low_stock FROM consumables WHERE quantity < 10")
-    low_stock = cursor.fetchone()['low_stock']
+    cursor = connection.cursor(dictionary=True)
     
-    # Get recent orders
+    # Get recent orders (limit first, then count items per order)
     cursor.execute("""
-        SELECT o.*, COUNT(oi.id) as item_count 
+        SELECT o.*, (SELECT COUNT(*) FROM order_items oi WHERE oi.order_id = o.id) AS item_count
         FROM orders o 
-        LEFT JOIN order_items oi ON o.id = oi.order_id 
-        GROUP BY o.id 
         ORDER BY o.created_at DESC 
         LIMIT 5
     """)
@@ -527,12 +1937,66 @@ def admin_dashboard():
     connection.close()
     
     return render_template('admin/dashboard.html',
-                         total_items=total_items,
-                         total_orders=total_orders,
-                         pending_orders=pending_orders,
-                         low_stock=low_stock,
+                         total_items=stats['total_items'],
+                         total_orders=stats['total_orders'],
+                         pending_orders=stats['pending_orders'],
+                         low_stock=stats['low_stock'],
                          recent_orders=recent_orders)
 
+@app.route('/admin/dashboard/stats')
+@admin_required
+def admin_dashboard_stats():
+    """Dashboard counters as JSON for in-place refresh"""
+    connection = get_db_connection()
+    if not connection:
+        return jsonify({'error': 'Database connection error'}), 503
+    try:
+        stats = get_dashboard_stats(connection)
+    except mysql.connector.Error as err:
+        logger.error(f"Dashboard stats error: {err}")
+        return jsonify({'error': 'Unable to load statistics'}), 500
+    finally:
+        connection.close()
+    stats['refreshed_at'] = stats['refreshed_at'].isoformat() if stats.get('refreshed_at') else None
+    return jsonify(stats)
+
+@app.route('/admin/events')
+@admin_required
+def admin_events():
+    """Server-sent events stream of order and stock deltas.
+
+    Resumes from the Last-Event-ID header after reconnects and sends a
+    'resync' event when the client missed events that left the buffer, or
+    when its id is ahead of the broker (the server restarted and ids began
+    again). Streams end after SSE_STREAM_SECONDS; the client reconnects
+    after the advertised retry delay and resumes from its last id.
+    """
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    current_id = event_broker.last_id()
+    resync = last_id is not None and last_id > current_id
+    if last_id is None or resync:
+        last_id = current_id
+
+    def stream(last_id):
+        yield 'retry: 5000\n\n'
+        if resync:
+            yield 'event: resync\ndata: {}\n\n'
+        deadline = time.monotonic() + SSE_STREAM_SECONDS
+        while time.monotonic() < deadline:
+            timeout = min(SSE_HEARTBEAT_SECONDS, max(deadline - time.monotonic(), 0))
+            events, missed = event_broker.wait(last_id, timeout)
+            if not events:
+                yield ': keepalive\n\n'
+                continue
+            if missed:
+                yield 'event: resync\ndata: {}\n\n'
+            for event_id, event, data in events:
+                yield f'id: {event_id}\nevent: {event}\ndata: {json.dumps(data)}\n\n'
+                last_id = event_id
+
+    return Response(stream(last_id), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/admin/inventory')
 @admin_required
 def admin_inventory():
@@ -587,6 +2051,70 @@ def admin_inventory():
                          total_pages=total_pages)
 
 
+# Outstanding quantity per consumable computed from borrow/return history
+_OUTSTANDING_BORROWS_SQL = """
+    SELECT b.consumable_id, SUM(b.quantity - COALESCE(r.returned, 0)) AS outstanding
+    FROM consumable_borrows b
+    LEFT JOIN (
+        SELECT borrow_id, SUM(returned_quantity + damaged_quantity) AS returned
+        FROM consumable_returns
+        GROUP BY borrow_id
+    ) r ON r.borrow_id = b.id
+    GROUP BY b.consumable_id
+"""
+
+_REBUILD_BORROWED_SQL = f"""
+    UPDATE consumables c
+    LEFT JOIN ({_OUTSTANDING_BORROWS_SQL}) h ON h.consumable_id = c.id
+    SET c.borrowed = COALESCE(h.outstanding, 0)
+"""
+
+
+def reconcile_borrowed(connection, fix=False):
+    """Compare consumables.borrowed with borrow/return history.
+
+    Returns the mismatching rows ({id, name, stored, actual}); with fix=True
+    the column is rebuilt from history in the same transaction.
+    """
+    cursor = connection.cursor(dictionary=True)
+    try:
+        cursor.execute(f"""
+            SELECT c.id, c.name, c.borrowed AS stored, COALESCE(h.outstanding, 0) AS actual
+            FROM consumables c
+            LEFT JOIN ({_OUTSTANDING_BORROWS_SQL}) h ON h.consumable_id = c.id
+            WHERE c.borrowed <> COALESCE(h.outstanding, 0)
+            FOR UPDATE
+        """)
+        mismatches = cursor.fetchall()
+        if fix and mismatches:
+            cursor.execute(_REBUILD_BORROWED_SQL)
+        connection.commit()
+        return mismatches
+    except mysql.connector.Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+@app.cli.command('reconcile-borrowed')
+@click.option('--fix', is_flag=True, help='Rebuild the borrowed column from borrow/return history')
+def reconcile_borrowed_command(fix):
+    """Verify (and optionally rebuild) outstanding borrow quantities"""
+    connection = get_db_connection()
+    if not connection:
+        raise click.ClickException('Database connection error')
+    mismatches = reconcile_borrowed(connection, fix=fix)
+    for row in mismatches:
+        click.echo(f"#{row['id']} {row['name']}: stored {row['stored']}, history {row['actual']}")
+    if not mismatches:
+        click.echo('Outstanding borrow quantities are consistent')
+    elif fix:
+        click.echo(f"Rebuilt {len(mismatches)} consumable(s)")
+    else:
+        raise click.ClickException(f"{len(mismatches)} mismatch(es); rerun with --fix to rebuild")
+
+
 @app.route('/admin/consumables')
 @admin_required
 def admin_consumables():
@@ -599,18 +2127,21 @@ def admin_consumables():
     cursor = connection.cursor(dictionary=True)
     try:
         params = []
+        rank_sql = None
         query = """
-            SELECT c.*,
-                   COALESCE((SELECT COALESCE(SUM(b.quantity),0) - COALESCE(SUM(r.returned_quantity + r.damaged_quantity),0)
-                     FROM consumable_borrows b LEFT JOIN consumable_returns r ON r.borrow_id = b.id
-                     WHERE b.consumable_id = c.id),0) AS borrowed
+            SELECT c.*
             FROM consumables c
             WHERE 1=1
         """
         if search:
-            query += " AND (c.name LIKE %s OR c.category LIKE %s)"
-            params.extend([f'%{search}%', f'%{search}%'])
-        query += " ORDER BY c.created_at DESC"
+            search_sql, search_params, rank_sql, rank_params = _search_clause(search, CONSUMABLE_SEARCH_COLUMNS, 'c')
+            query += f" AND {search_sql}"
+            params.extend(search_params)
+        if rank_sql:
+            query += f" ORDER BY {rank_sql} DESC, c.created_at DESC"
+            params.extend(rank_params)
+        else:
+            query += " ORDER BY c.created_at DESC"
         cursor.execute(query, params)
         items = cursor.fetchall()
     finally:
@@ -647,7 +2178,9 @@ def admin_consumables_add():
             """,
             (name, category, quantity, returnable)
         )
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
         flash('Consumable added successfully', 'success')
     except mysql.connector.Error as err:
         connection.rollback()
@@ -689,7 +2222,9 @@ def admin_consumables_update(cid):
             """,
             (name, quantity, category, returnable, cid)
         )
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
         flash('Consumable updated', 'success')
     except mysql.connector.Error as err:
         connection.rollback()
@@ -716,7 +2251,9 @@ def admin_consumables_delete(cid):
             return redirect(url_for('admin_consumables'))
         cursor = connection.cursor()
         cursor.execute("DELETE FROM consumables WHERE id=%s", (cid,))
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
         flash('Consumable deleted', 'success')
     except mysql.connector.Error as err:
         connection.rollback()
@@ -757,9 +2294,16 @@ def admin_consumables_borrow(cid):
             flash('Insufficient stock', 'error')
             return redirect(url_for('admin_consumables'))
 
-        # Deduct stock
+        # Deduct stock (guarded against concurrent borrows) and track outstanding quantity
         cursor2 = connection.cursor()
-        cursor2.execute("UPDATE consumables SET quantity = quantity - %s WHERE id=%s", (quantity, cid))
+        cursor2.execute(
+            "UPDATE consumables SET quantity = quantity - %s, borrowed = borrowed + %s WHERE id=%s AND quantity >= %s",
+            (quantity, quantity, cid, quantity)
+        )
+        if cursor2.rowcount != 1:
+            connection.rollback()
+            flash('Insufficient stock', 'error')
+            return redirect(url_for('admin_consumables'))
         # Create borrow
         cursor2.execute(
             """
@@ -768,7 +2312,13 @@ def admin_consumables_borrow(cid):
             """,
             (cid, borrower_name, borrower_type, contact_info, department, quantity)
         )
+        low_stock = _low_stock_delta(cursor2, {cid: -quantity})
+        bump_dashboard_stats(cursor2, low_stock=low_stock)
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
+        event_broker.publish('stock', {'reason': 'borrow', 'low_stock': low_stock,
+                                       'changes': [{'consumable_id': cid, 'delta': -quantity}]})
         flash('Borrow recorded and stock updated', 'success')
     except mysql.connector.Error as err:
         connection.rollback()
@@ -816,12 +2366,18 @@ def admin_consumables_return(borrow_id):
             """,
             (borrow_id, returned_quantity, damaged_quantity)
         )
-        # Update stock: add returned to quantity; add damaged to damaged
+        # Update stock: add returned to quantity; add damaged to damaged; clear outstanding
         cursor2.execute(
-            "UPDATE consumables SET quantity = quantity + %s, damaged = damaged + %s WHERE id=%s",
-            (returned_quantity, damaged_quantity, b['consumable_id'])
+            "UPDATE consumables SET quantity = quantity + %s, damaged = damaged + %s, borrowed = borrowed - %s WHERE id=%s",
+            (returned_quantity, damaged_quantity, total, b['consumable_id'])
         )
+        low_stock = _low_stock_delta(cursor2, {b['consumable_id']: returned_quantity})
+        bump_dashboard_stats(cursor2, low_stock=low_stock)
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
+        event_broker.publish('stock', {'reason': 'return', 'low_stock': low_stock, 'changes': [
+            {'consumable_id': b['consumable_id'], 'delta': returned_quantity, 'damaged': damaged_quantity}]})
         flash('Return recorded and stock updated', 'success')
     except mysql.connector.Error as err:
         connection.rollback()
@@ -878,6 +2434,7 @@ def admin_add_lab():
             """,
             (name, status),
         )
+        bump_table_versions(cursor, 'laboratory')
         connection.commit()
         log_admin_action('Add Lab', f'Added lab: {name} ({status})')
         flash('Laboratory added successfully!', 'success')
@@ -919,7 +2476,9 @@ def admin_add_consumable():
                 VALUES (%s, %s, %s, %s, %s)
             """, (name, description, category, quantity, image_url))
             
+            bump_table_versions(cursor, 'consumables')
             connection.commit()
+            _invalidate_catalogue()
             log_admin_action('Add Consumable', f'Added: {name}')
             flash('Consumable added successfully!', 'success')
             return redirect(url_for('admin_inventory'))
@@ -978,7 +2537,9 @@ def admin_edit_consumable(id):
             WHERE id = %s
         """, (name, description, category, quantity, image_url, id))
         
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
         log_admin_action('Edit Consumable', f'Edited: {name}')
         flash('Consumable updated successfully!', 'success')
         return redirect(url_for('admin_inventory'))
@@ -1016,7 +2577,9 @@ def admin_delete_consumable(id):
     
     try:
         cursor.execute("DELETE FROM consumables WHERE id = %s", (id,))
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
         log_admin_action('Delete Consumable', f'Deleted: {consumable["name"]}')
         flash('Consumable deleted successfully!', 'success')
     except mysql.connector.Error as err:
@@ -1058,11 +2621,18 @@ def admin_orders():
         query += " AND o.status = %s"
         params.append(status)
     
+    rank_sql = None
     if search:
-        query += " AND (o.user_name LIKE %s OR o.department LIKE %s)"
-        params.extend([f'%{search}%', f'%{search}%'])
+        search_sql, search_params, rank_sql, rank_params = _search_clause(search, ORDER_SEARCH_COLUMNS, 'o')
+        query += f" AND {search_sql}"
+        params.extend(search_params)
     
-    query += " GROUP BY o.id ORDER BY o.created_at DESC"
+    query += " GROUP BY o.id"
+    if rank_sql:
+        query += f" ORDER BY {rank_sql} DESC, o.created_at DESC"
+        params.extend(rank_params)
+    else:
+        query += " ORDER BY o.created_at DESC"
     
     cursor.execute(query, params)
     orders = cursor.fetchall()
@@ -1108,6 +2678,121 @@ def admin_order_detail(id):
     
     return render_template('admin/order_detail.html', order=order, order_items=order_items)
 
+class InsufficientStockError(Exception):
+    """Raised when a guarded stock deduction no longer matches the locked stock levels"""
+
+
+def approve_orders(cursor, order_ids):
+    """Approve a batch of orders inside the caller's transaction.
+
+    Orders and the consumables they reference are locked (FOR UPDATE).
+    Reserved pending orders just confirm their reservation; other orders
+    are checked against stock in ascending id order and every short item
+    is reported, then all accepted deductions are applied with a single
+    guarded UPDATE ... JOIN. The caller commits or rolls back.
+
+    Returns {order_id: {'result': 'approved' | 'insufficient_stock' |
+    'already_approved' | 'not_found', 'message': str, 'shortages': [...]}};
+    approvals that deducted stock carry 'stock_moved': True.
+    """
+    order_ids = sorted({int(i) for i in order_ids})
+    results = {}
+    if not order_ids:
+        return results
+    placeholders = ','.join(['%s'] * len(order_ids))
+
+    cursor.execute(f"SELECT id, status, stock_reserved FROM orders WHERE id IN ({placeholders}) FOR UPDATE", order_ids)
+    orders = {row['id']: row for row in cursor.fetchall()}
+
+    confirm_ids = []
+    deduct_ids = []
+    for order_id in order_ids:
+        order = orders.get(order_id)
+        if not order:
+            results[order_id] = {'result': 'not_found', 'message': 'Order not found', 'shortages': []}
+        elif order['status'] == 'Approved':
+            results[order_id] = {'result': 'already_approved', 'message': 'Order is already approved', 'shortages': []}
+        elif order['status'] == 'Pending' and order['stock_reserved']:
+            confirm_ids.append(order_id)
+        else:
+            deduct_ids.append(order_id)
+
+    approved_ids = list(confirm_ids)
+    for order_id in confirm_ids:
+        results[order_id] = {'result': 'approved', 'message': 'Reserved stock confirmed', 'shortages': [],
+                             'status': 'Approved', 'previous_status': 'Pending'}
+
+    if deduct_ids:
+        deduct_placeholders = ','.join(['%s'] * len(deduct_ids))
+        cursor.execute(f"""
+            SELECT oi.order_id, oi.consumable_id, oi.quantity, c.name, c.quantity AS current_stock
+            FROM order_items oi
+            JOIN consumables c ON oi.consumable_id = c.id
+            WHERE oi.order_id IN ({deduct_placeholders})
+            ORDER BY oi.order_id
+            FOR UPDATE
+        """, deduct_ids)
+        items_by_order = {}
+        available = {}
+        for row in cursor.fetchall():
+            items_by_order.setdefault(row['order_id'], []).append(row)
+            available[row['consumable_id']] = row['current_stock']
+
+        for order_id in deduct_ids:
+            needed = {}
+            names = {}
+            for item in items_by_order.get(order_id, []):
+                needed[item['consumable_id']] = needed.get(item['consumable_id'], 0) + item['quantity']
+                names[item['consumable_id']] = item['name']
+            shortages = [
+                {'consumable_id': cid, 'name': names[cid], 'available': available[cid], 'requested': qty}
+                for cid, qty in needed.items() if available[cid] < qty
+            ]
+            if shortages:
+                results[order_id] = {
+                    'result': 'insufficient_stock',
+                    'message': 'Insufficient stock for ' + ', '.join(
+                        f"{short['name']} (available: {short['available']}, requested: {short['requested']})" for short in shortages),
+                    'shortages': shortages,
+                }
+                continue
+            for cid, qty in needed.items():
+                available[cid] -= qty
+            approved_ids.append(order_id)
+            results[order_id] = {'result': 'approved', 'message': 'Stock quantities updated', 'shortages': [],
+                                 'status': 'Approved', 'previous_status': orders[order_id]['status'],
+                                 'stock_moved': True}
+
+        accepted = [i for i in deduct_ids if results[i]['result'] == 'approved']
+        if accepted:
+            accepted_placeholders = ','.join(['%s'] * len(accepted))
+            cursor.execute(f"""
+                SELECT COUNT(DISTINCT consumable_id) AS cnt FROM order_items WHERE order_id IN ({accepted_placeholders})
+            """, accepted)
+            expected = cursor.fetchone()['cnt']
+            cursor.execute(f"""
+                UPDATE consumables c
+                JOIN (
+                    SELECT consumable_id, SUM(quantity) AS qty
+                    FROM order_items
+                    WHERE order_id IN ({accepted_placeholders})
+                    GROUP BY consumable_id
+                ) r ON r.consumable_id = c.id
+                SET c.quantity = c.quantity - r.qty
+                WHERE c.quantity >= r.qty
+            """, accepted)
+            if cursor.rowcount != expected:
+                raise InsufficientStockError('Stock changed while approving orders')
+
+    if approved_ids:
+        approved_placeholders = ','.join(['%s'] * len(approved_ids))
+        cursor.execute(
+            f"UPDATE orders SET status = 'Approved', stock_reserved = 0 WHERE id IN ({approved_placeholders})",
+            approved_ids,
+        )
+    return results
+
+
 @app.route('/admin/orders/<int:id>/approve', methods=['POST'])
 @admin_required
 def admin_approve_order(id):
@@ -1117,40 +2802,24 @@ def admin_approve_order(id):
         flash('Database connection error', 'error')
         return redirect(url_for('admin_order_detail', id=id))
     
-    cursor = connection.cursor()
+    cursor = connection.cursor(dictionary=True)
     
     try:
-        # Update order status
-        cursor.execute("UPDATE orders SET status = 'Approved' WHERE id = %s", (id,))
-        
-        # Get order items and reduce stock
-        cursor.execute("""
-            SELECT oi.consumable_id, oi.quantity, c.name, c.quantity as current_stock
-            FROM order_items oi
-            JOIN consumables c ON oi.consumable_id = c.id
-            WHERE oi.order_id = %s
-        """, (id,))
+        result = approve_orders(cursor, [id])[id]
+        if result['result'] != 'approved':
+            connection.rollback()
+            flash(result['message'], 'error')
+            return redirect(url_for('admin_order_detail', id=id))
         
-        order_items = cursor.fetchall()
+        low_stock = _bump_dashboard_for_orders(cursor, {id: result}, -1)
+        bump_table_versions(cursor, 'consumables')
+        connection.commit()
+        _invalidate_catalogue()
+        _publish_order_changes({id: result}, low_stock)
+        log_admin_action('Approve Order', f'Approved order #{id}')
+        flash(f"Order approved successfully! {result['message']}.", 'success')
         
-        for item in order_items:
-            consumable_id, quantity, name, current_stock = item
-            new_stock = current_stock - quantity
-            
-            if new_stock < 0:
-                connection.rollback()
-                flash(f'Insufficient stock for {name}. Available: {current_stock}, Requested: {quantity}', 'error')
-                return redirect(url_for('admin_order_detail', id=id))
-            
-            cursor.execute("""
-                UPDATE consumables SET quantity = %s WHERE id = %s
-            """, (new_stock, consumable_id))
-        
-        connection.commit()
-        log_admin_action('Approve Order', f'Approved order #{id}')
-        flash('Order approved successfully! Stock quantities updated.', 'success')
-        
-    except mysql.connector.Error as err:
+    except (mysql.connector.Error, InsufficientStockError) as err:
         connection.rollback()
         flash('Error approving order', 'error')
         logger.error(f"Approve order error: {err}")
@@ -1160,6 +2829,46 @@ def admin_approve_order(id):
     
     return redirect(url_for('admin_order_detail', id=id))
 
+def reject_orders(cursor, order_ids):
+    """Reject a batch of orders inside the caller's transaction.
+
+    Stock still reserved by pending orders is returned with one set-based
+    UPDATE. Returns {order_id: {'result': 'rejected' | 'already_rejected'
+    | 'not_found', 'message': str}}; 'stock_moved' marks released reservations.
+    """
+    order_ids = sorted({int(i) for i in order_ids})
+    results = {}
+    if not order_ids:
+        return results
+    placeholders = ','.join(['%s'] * len(order_ids))
+
+    cursor.execute(f"SELECT id, status, stock_reserved FROM orders WHERE id IN ({placeholders}) FOR UPDATE", order_ids)
+    orders = {row['id']: row for row in cursor.fetchall()}
+
+    reject_ids = []
+    release_ids = []
+    for order_id in order_ids:
+        order = orders.get(order_id)
+        if not order:
+            results[order_id] = {'result': 'not_found', 'message': 'Order not found'}
+        elif order['status'] == 'Rejected':
+            results[order_id] = {'result': 'already_rejected', 'message': 'Order is already rejected'}
+        else:
+            reserved = order['status'] == 'Pending' and bool(order['stock_reserved'])
+            if reserved:
+                release_ids.append(order_id)
+            reject_ids.append(order_id)
+            results[order_id] = {'result': 'rejected', 'message': 'Order rejected',
+                                 'status': 'Rejected', 'previous_status': order['status'], 'stock_moved': reserved}
+
+    if release_ids:
+        _release_order_stock(cursor, release_ids)
+    if reject_ids:
+        reject_placeholders = ','.join(['%s'] * len(reject_ids))
+        cursor.execute(f"UPDATE orders SET status = 'Rejected' WHERE id IN ({reject_placeholders})", reject_ids)
+    return results
+
+
 @app.route('/admin/orders/<int:id>/reject', methods=['POST'])
 @admin_required
 def admin_reject_order(id):
@@ -1169,11 +2878,19 @@ def admin_reject_order(id):
         flash('Database connection error', 'error')
         return redirect(url_for('admin_order_detail', id=id))
     
-    cursor = connection.cursor()
+    cursor = connection.cursor(dictionary=True)
     
     try:
-        cursor.execute("UPDATE orders SET status = 'Rejected' WHERE id = %s", (id,))
+        result = reject_orders(cursor, [id])[id]
+        if result['result'] != 'rejected':
+            connection.rollback()
+            flash(result['message'], 'error')
+            return redirect(url_for('admin_order_detail', id=id))
+        low_stock = _bump_dashboard_for_orders(cursor, {id: result}, 1)
+        bump_table_versions(cursor, 'consumables')
         connection.commit()
+        _invalidate_catalogue()
+        _publish_order_changes({id: result}, low_stock)
         log_admin_action('Reject Order', f'Rejected order #{id}')
         flash('Order rejected successfully!', 'success')
     except mysql.connector.Error as err:
@@ -1186,166 +2903,444 @@ def admin_reject_order(id):
     
     return redirect(url_for('admin_order_detail', id=id))
 
-@app.route('/admin/export/orders')
+@app.route('/admin/orders/bulk', methods=['POST'])
 @admin_required
-def admin_export_orders():
-    """Export orders to CSV"""
+def admin_bulk_orders():
+    """Approve or reject many orders in one transaction.
+
+    Accepts JSON {"action": "approve"|"reject", "order_ids": [...]} (or the
+    same fields as form data) and returns a per-order result object.
+    """
+    payload = request.get_json(silent=True) or {}
+    action = payload.get('action') or request.form.get('action')
+    raw_ids = payload.get('order_ids') if payload else request.form.getlist('order_ids')
+
+    if action not in ('approve', 'reject'):
+        return jsonify({'error': "action must be 'approve' or 'reject'"}), 400
+    if raw_ids is not None and not isinstance(raw_ids, list):
+        return jsonify({'error': 'order_ids must be a list of integers'}), 400
+    try:
+        order_ids = sorted({int(i) for i in raw_ids or []})
+    except (TypeError, ValueError):
+        return jsonify({'error': 'order_ids must be a list of integers'}), 400
+    if not order_ids:
+        return jsonify({'error': 'No order_ids provided'}), 400
+    if len(order_ids) > BULK_ORDER_LIMIT:
+        return jsonify({'error': f'At most {BULK_ORDER_LIMIT} orders per request'}), 400
+
     connection = get_db_connection()
     if not connection:
-        flash('Database connection error', 'error')
+        return jsonify({'error': 'Database connection error'}), 503
+
+    cursor = connection.cursor(dictionary=True)
+    try:
+        if action == 'approve':
+            results = approve_orders(cursor, order_ids)
+        else:
+            results = reject_orders(cursor, order_ids)
+        low_stock = _bump_dashboard_for_orders(cursor, results, -1 if action == 'approve' else 1)
+        bump_table_versions(cursor, 'consumables')
+        connection.commit()
+        _invalidate_catalogue()
+    except (mysql.connector.Error, InsufficientStockError) as err:
+        connection.rollback()
+        logger.error(f"Bulk {action} error: {err}")
+        return jsonify({'error': f'Bulk {action} failed; no orders were changed'}), 500
+    finally:
+        cursor.close()
+        connection.close()
+
+    done = [order_id for order_id, r in results.items() if r['result'] in ('approved', 'rejected')]
+    _publish_order_changes(results, low_stock)
+    if action == 'approve':
+        log_admin_actions([('Approve Order', f'Approved order #{order_id} (bulk)') for order_id in done])
+    else:
+        log_admin_actions([('Reject Order', f'Rejected order #{order_id} (bulk)') for order_id in done])
+
+    return jsonify({
+        'action': action,
+        'requested': len(order_ids),
+        'processed': len(done),
+        'results': {str(order_id): r for order_id, r in results.items()},
+    })
+
+def _stream_csv(connection, header, query, params, row_fn=None, setup=()):
+    """Yield CSV text for `query`, read in EXPORT_FETCH_SIZE batches from an unbuffered cursor.
+
+    `connection` is a dedicated pooled connection, since the stream outlives
+    the request context. It goes back to the pool once every row has been
+    read; an abandoned download leaves rows unread, so it is discarded rather
+    than drained. `row_fn` maps a row to its CSV fields and `setup`
+    statements run before the query.
+    """
+    completed = False
+    cursor = connection.cursor(buffered=False)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    try:
+        writer.writerow(header)
+        yield buffer.getvalue()
+
+        for statement in setup:
+            cursor.execute(statement)
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_FETCH_SIZE)
+            if not rows:
+                break
+            buffer.seek(0)
+            buffer.truncate(0)
+            writer.writerows(map(row_fn, rows) if row_fn else rows)
+            yield buffer.getvalue()
+        completed = True
+    except mysql.connector.Error as err:
+        logger.error(f"CSV export error: {err}")
+    finally:
+        if completed:
+            cursor.close()
+            connection.release()
+        else:
+            connection.discard()
+
+@app.route('/admin/export/orders')
+@admin_required
+def admin_export_orders():
+    """Export orders to CSV.
+
+    Rows are streamed from an unbuffered cursor on a dedicated pooled
+    connection, so memory stays flat and the download starts at once.
+    Optional filters: status, date_from, date_to (YYYY-MM-DD, on created_at).
+    """
+    status = request.args.get('status', '')
+    try:
+        date_from = datetime.strptime(request.args['date_from'], '%Y-%m-%d') if request.args.get('date_from') else None
+        date_to = datetime.strptime(request.args['date_to'], '%Y-%m-%d') if request.args.get('date_to') else None
+    except ValueError:
+        flash('Invalid date filter. Please use YYYY-MM-DD.', 'error')
         return redirect(url_for('admin_orders'))
     
-    cursor = connection.cursor(dictionary=True)
+    where = "1=1"
+    params = []
+    if status:
+        where += " AND o.status = %s"
+        params.append(status)
+    if date_from:
+        where += " AND o.created_at >= %s"
+        params.append(date_from)
+    if date_to:
+        where += " AND o.created_at < %s"
+        params.append(date_to + timedelta(days=1))
     
-    # Get all orders with items
-    cursor.execute("""
-        SELECT o.*, GROUP_CONCAT(CONCAT(c.name, ' (', oi.quantity, ')') SEPARATOR '; ') as items
+    query = f"""
+        SELECT o.id, o.user_name, o.department, o.purpose, o.date_needed, o.status,
+               GROUP_CONCAT(CONCAT(c.name, ' (', oi.quantity, ')') SEPARATOR '; ') as items,
+               o.created_at
         FROM orders o 
         LEFT JOIN order_items oi ON o.id = oi.order_id 
         LEFT JOIN consumables c ON oi.consumable_id = c.id
+        WHERE {where}
         GROUP BY o.id 
         ORDER BY o.created_at DESC
-    """)
-    
-    orders = cursor.fetchall()
-    cursor.close()
-    connection.close()
-    
-    # Create CSV
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['Order ID', 'User Name', 'Department', 'Purpose', 'Date Needed', 'Status', 'Items', 'Created At'])
-    
-    # Write data
-    for order in orders:
-        writer.writerow([
-            order['id'],
-            order['user_name'],
-            order['department'],
-            order['purpose'],
-            order['date_needed'],
-            order['status'],
-            order['items'] or 'No items',
-            order['created_at']
-        ])
+    """
     
-    output.seek(0)
+    # The stream outlives the request context, so it gets its own connection
+    try:
+        connection = db_pool.acquire()
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        flash('Database connection error', 'error')
+        return redirect(url_for('admin_orders'))
     
-    log_admin_action('Export Orders', f'Exported {len(orders)} orders to CSV')
+    filters = ', '.join(f"{k}={v}" for k, v in (('status', status), ('date_from', request.args.get('date_from')),
+                                                 ('date_to', request.args.get('date_to'))) if v)
+    log_admin_action('Export Orders', f"Exported orders to CSV{' (' + filters + ')' if filters else ''}")
     
-    return send_file(
-        io.BytesIO(output.getvalue().encode('utf-8')),
-        mimetype='text/csv',
-        as_attachment=True,
-        download_name=f'orders_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
+    header = ['Order ID', 'User Name', 'Department', 'Purpose', 'Date Needed', 'Status', 'Items', 'Created At']
+    rows = _stream_csv(connection, header, query, params, lambda row: [*row[:6], row[6] or 'No items', row[7]],
+                       setup=("SET SESSION group_concat_max_len = 1048576",))
+    response = Response(rows, mimetype='text/csv')
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename=orders_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
     )
+    response.call_on_close(connection.release)
+    return response
+
+def _iter_rows(cursor, size=None):
+    """Yield rows from an executed (ideally unbuffered) cursor in fetchmany() batches"""
+    size = size or EXPORT_FETCH_SIZE
+    while True:
+        rows = cursor.fetchmany(size)
+        if not rows:
+            return
+        yield from rows
+
+
+def write_xlsx(output, title, headers, rows, header_fill=None):
+    """Stream rows into an .xlsx using openpyxl write-only mode.
+
+    Write-only sheets need column widths before the first row, so widths
+    are sized from the headers and the first EXCEL_WIDTH_SAMPLE_ROWS rows;
+    the rest of the iterable is written straight through without being
+    held in memory. Returns the number of data rows written.
+    """
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+
+    rows = iter(rows)
+    sample = list(itertools.islice(rows, EXCEL_WIDTH_SAMPLE_ROWS))
+    widths = [len(str(header)) for header in headers]
+    for row in sample:
+        for idx, value in enumerate(row):
+            if value is not None:
+                widths[idx] = max(widths[idx], len(str(value)))
+    for idx, width in enumerate(widths, 1):
+        ws.column_dimensions[get_column_letter(idx)].width = min(width + 2, 50)
+
+    header_font = Font(bold=True)
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header)
+        cell.font = header_font
+        if header_fill:
+            cell.fill = header_fill
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    count = 0
+    for row in itertools.chain(sample, rows):
+        ws.append(row)
+        count += 1
+
+    wb.save(output)
+    return count
+
+
+def _send_xlsx(output, download_name):
+    """Send a finished workbook file object as an attachment"""
+    output.seek(0)
+    return send_file(output, mimetype=XLSX_MIMETYPE, as_attachment=True, download_name=download_name)
+
+
+def _with_progress(rows, progress, every=1000):
+    """Pass rows through, reporting the running count to a job progress callback"""
+    count = 0
+    for row in rows:
+        yield row
+        count += 1
+        if progress and count % every == 0:
+            progress(count)
+
+
+INVENTORY_EXPORT_HEADERS = ['ID', 'Name', 'Description', 'Category', 'Quantity', 'Image URL', 'Created At']
+
+
+def export_inventory_xlsx(connection, output, progress=None):
+    """Write every consumable to an .xlsx file object; returns the row count"""
+    header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute("""
+            SELECT id, name, description, category, quantity, image_url, created_at
+            FROM consumables ORDER BY category, name
+        """)
+        return write_xlsx(output, "Inventory", INVENTORY_EXPORT_HEADERS,
+                          _with_progress(_iter_rows(cursor), progress), header_fill)
+    finally:
+        cursor.close()
+
 
 @app.route('/admin/export/inventory')
 @admin_required
 def admin_export_inventory():
-    """Export inventory to Excel"""
+    """Export inventory to Excel (add background=1 to queue it as a job)"""
+    if request.args.get('background') == '1':
+        job_id = submit_job('export_inventory', {})
+        return _job_submitted(job_id, url_for('admin_inventory'))
+
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
         return redirect(url_for('admin_inventory'))
     
-    cursor = connection.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM consumables ORDER BY category, name")
-    consumables = cursor.fetchall()
-    cursor.close()
-    connection.close()
-    
-    # Create Excel workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Inventory"
-    
-    # Style headers
-    header_font = Font(bold=True)
-    header_fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-    
-    # Write headers
-    headers = ['ID', 'Name', 'Description', 'Category', 'Quantity', 'Image URL', 'Created At']
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
-        cell.fill = header_fill
-    
-    # Write data
-    for row, item in enumerate(consumables, 2):
-        ws.cell(row=row, column=1, value=item['id'])
-        ws.cell(row=row, column=2, value=item['name'])
-        ws.cell(row=row, column=3, value=item['description'])
-        ws.cell(row=row, column=4, value=item['category'])
-        ws.cell(row=row, column=5, value=item['quantity'])
-        ws.cell(row=row, column=6, value=item['image_url'])
-        ws.cell(row=row, column=7, value=item['created_at'])
-    
-    # Auto-adjust column widths
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                if len(str(cell.value)) > max_length:
-                    max_length = len(str(cell.value))
-            except:
-                pass
-        adjusted_width = min(max_length + 2, 50)
-        ws.column_dimensions[column_letter].width = adjusted_width
-    
-    # Save to bytes
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
+    output = tempfile.TemporaryFile()
+    try:
+        count = export_inventory_xlsx(connection, output)
+    except mysql.connector.Error as err:
+        output.close()
+        logger.error(f"Export inventory error: {err}")
+        flash('Error exporting inventory', 'error')
+        return redirect(url_for('admin_inventory'))
+    finally:
+        connection.close()
     
-    log_admin_action('Export Inventory', f'Exported {len(consumables)} items to Excel')
+    log_admin_action('Export Inventory', f'Exported {count} items to Excel')
     
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'inventory_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
-    )
+    return _send_xlsx(output, f'inventory_export_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx')
+
+AUDIT_PAGE_SIZE = 50
+
 
 @app.route('/admin/audit-logs')
 @admin_required
 def admin_audit_logs():
-    """View audit logs"""
+    """View audit logs, newest first.
+
+    Keyset paginated on (timestamp, id) with ?after= cursor tokens and
+    optionally filtered by admin_username and/or action. Each filter leads a
+    (column, timestamp, id) index, so a page is one short index range scan
+    however large the table grows; there is no COUNT(*) or OFFSET.
+    """
+    # Show entries still waiting in the audit writer's buffer
+    audit_writer.flush()
+
+    admin_filter = request.args.get('admin_username', '').strip()
+    action_filter = request.args.get('action', '').strip()
+    after = _decode_cursor(request.args.get('after', ''))
+    filters = {key: value for key, value in (('admin_username', admin_filter), ('action', action_filter)) if value}
+
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
-        return render_template('admin/audit_logs.html', logs=[])
-    
+        return render_template('admin/audit_logs.html', logs=[], filters=filters, admins=[], actions=[],
+                               next_cursor=None, paged=False)
+
+    conditions = []
+    params = []
+    if admin_filter:
+        conditions.append("admin_username = %s")
+        params.append(admin_filter)
+    if action_filter:
+        conditions.append("action = %s")
+        params.append(action_filter)
+    if after:
+        conditions.append("(timestamp < %s OR (timestamp = %s AND id < %s))")
+        params.extend([after[0], after[0], after[1]])
+
     cursor = connection.cursor(dictionary=True)
-    
-    # Get logs with pagination
-    page = request.args.get('page', 1, type=int)
-    per_page = 50
-    
-    cursor.execute("SELECT COUNT(*) as total FROM audit_logs")
-    total_logs = cursor.fetchone()['total']
-    
-    cursor.execute("""
-        SELECT * FROM audit_logs 
-        ORDER BY timestamp DESC 
-        LIMIT %s OFFSET %s
-    """, (per_page, (page - 1) * per_page))
-    
-    logs = cursor.fetchall()
-    cursor.close()
-    connection.close()
-    
-    total_pages = (total_logs + per_page - 1) // per_page
-    
-    return render_template('admin/audit_logs.html',
-                         logs=logs,
-                         page=page,
-                         total_pages=total_pages)
+    try:
+        cursor.execute(f"""
+            SELECT id, admin_username, action, details, timestamp FROM audit_logs
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY timestamp DESC, id DESC LIMIT %s
+        """, params + [AUDIT_PAGE_SIZE + 1])
+        logs = cursor.fetchall()
+        cursor.execute("SELECT username FROM admin_users ORDER BY username")
+        admins = [row['username'] for row in cursor.fetchall()]
+        # Loose index scan over idx_audit_logs_action_timestamp_id
+        cursor.execute("SELECT DISTINCT action FROM audit_logs WHERE action IS NOT NULL ORDER BY action")
+        actions = [row['action'] for row in cursor.fetchall()]
+    except mysql.connector.Error as err:
+        logger.error(f"Audit log view error: {err}")
+        flash('Error loading audit logs', 'error')
+        logs, admins, actions = [], [], []
+    finally:
+        cursor.close()
+        connection.close()
+
+    has_next = len(logs) > AUDIT_PAGE_SIZE
+    logs = logs[:AUDIT_PAGE_SIZE]
+    next_cursor = _encode_cursor(logs[-1]['timestamp'], logs[-1]['id']) if has_next else None
+
+    return render_template('admin/audit_logs.html', logs=logs, filters=filters, admins=admins, actions=actions,
+                           next_cursor=next_cursor, paged=bool(after))
+
+
+def _month_start(moment, months_back=0):
+    """First instant of moment's calendar month, shifted back by months_back months"""
+    index = moment.year * 12 + moment.month - 1 - months_back
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def archive_audit_logs(connection, retention_months=None, archive_dir=None):
+    """Move audit entries older than the retention window into monthly gzip files.
+
+    Every calendar month before the cutoff is appended to
+    audit_logs_YYYY-MM.jsonl.gz in archive_dir, AUDIT_ARCHIVE_BATCH rows at a
+    time in (timestamp, id) order. Each batch is synced to disk before it is
+    deleted and committed, so an interrupted run can leave at most one batch
+    archived twice, never lost, and no statement holds locks for long.
+    Returns {'YYYY-MM': rows archived}.
+    """
+    retention_months = AUDIT_RETENTION_MONTHS if retention_months is None else retention_months
+    archive_dir = archive_dir or AUDIT_ARCHIVE_DIR
+    cutoff = _month_start(datetime.now(), retention_months)
+
+    cursor = connection.cursor()
+    archived = {}
+    try:
+        while True:
+            # Rows are deleted as they are archived, so the minimum is always the next month to do
+            cursor.execute("SELECT MIN(timestamp) FROM audit_logs")
+            oldest = cursor.fetchone()[0]
+            if oldest is None or oldest >= cutoff:
+                return archived
+            os.makedirs(archive_dir, exist_ok=True)
+
+            month = _month_start(oldest)
+            next_month = _month_start(month, -1)
+            label = month.strftime('%Y-%m')
+            path = os.path.join(archive_dir, f'audit_logs_{label}.jsonl.gz')
+            with open(path, 'ab') as raw, gzip.GzipFile(fileobj=raw, mode='ab') as archive:
+                while True:
+                    cursor.execute("""
+                        SELECT id, admin_username, action, details, timestamp FROM audit_logs
+                        WHERE timestamp >= %s AND timestamp < %s
+                        ORDER BY timestamp, id LIMIT %s
+                    """, (month, next_month, AUDIT_ARCHIVE_BATCH))
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+                    archive.write(b''.join(
+                        json.dumps({
+                            'id': row_id, 'admin_username': username, 'action': action,
+                            'details': details, 'timestamp': stamp.isoformat(),
+                        }).encode('utf-8') + b'\n'
+                        for row_id, username, action, details, stamp in rows
+                    ))
+                    archive.flush()
+                    os.fsync(raw.fileno())
+                    cursor.execute(
+                        f"DELETE FROM audit_logs WHERE id IN ({','.join(['%s'] * len(rows))})",
+                        [row[0] for row in rows],
+                    )
+                    connection.commit()
+                    archived[label] = archived.get(label, 0) + len(rows)
+    finally:
+        cursor.close()
+
+
+@app.cli.command('archive-audit-logs')
+@click.option('--retention-months', type=int, default=None, help='Override AUDIT_RETENTION_MONTHS')
+def archive_audit_logs_command(retention_months):
+    """Move old audit entries to compressed monthly archive files"""
+    connection = get_db_connection()
+    if not connection:
+        raise click.ClickException('Database connection error')
+    audit_writer.flush()
+    archived = archive_audit_logs(connection, retention_months)
+    for label, count in archived.items():
+        click.echo(f"{label}: {count} entries")
+    click.echo(f"Archived {sum(archived.values())} audit entries to {AUDIT_ARCHIVE_DIR}")
 
 
+@app.route('/admin/db/pool-stats')
+@admin_required
+def admin_db_pool_stats():
+    """Connection pool counters (borrowed, waiting, created, recycled)"""
+    return jsonify(db_pool.stats())
+
+@app.route('/admin/cache-stats')
+@admin_required
+def admin_cache_stats():
+    """Query cache counters per namespace (hits, misses, invalidations)"""
+    return jsonify(query_cache.stats())
+
+@app.route('/admin/audit/writer-stats')
+@admin_required
+def admin_audit_writer_stats():
+    """Audit writer counters (queued, written, spooled, replayed, pending)"""
+    return jsonify(audit_writer.stats())
+
 @app.route('/admin/categories/add', methods=['POST'])
 @admin_required
 def admin_add_category():
@@ -1368,7 +3363,9 @@ def admin_add_category():
         row = cursor.fetchone()
         if not row:
             cursor.execute("INSERT INTO asset_categories (name) VALUES (%s)", (name,))
+            bump_table_versions(cursor, 'asset_categories')
             connection.commit()
+            _invalidate_asset_categories()
             log_admin_action('Add Category', f'Added category: {name}')
             flash('Category added successfully!', 'success')
         else:
@@ -1385,6 +3382,7 @@ def admin_add_category():
 
 @app.route('/admin/labs/<int:lab_id>/assets')
 @admin_required
+@conditional_page('lab_assets', 'asset_categories', 'laboratory')
 def admin_lab_assets(lab_id):
     """View all assets in a specific laboratory"""
     connection = get_db_connection()
@@ -1413,19 +3411,21 @@ def admin_lab_assets(lab_id):
         per_page = request.args.get('per_page', 15, type=int)
         
         # Build query for assets
-        query = "SELECT * FROM lab_assets WHERE lab_id = %s"
+        where = "lab_id = %s"
         params = [lab_id]
+        rank_sql = None
         
         if search:
-            query += " AND (name LIKE %s OR asset_code LIKE %s OR description LIKE %s)"
-            params.extend([f'%{search}%', f'%{search}%', f'%{search}%'])
+            search_sql, search_params, rank_sql, rank_params = _search_clause(search, ASSET_SEARCH_COLUMNS)
+            where += f" AND {search_sql}"
+            params.extend(search_params)
         
         if category_filter:
-            query += " AND category = %s"
+            where += " AND category = %s"
             params.append(category_filter)
         
         if status_filter:
-            query += " AND status = %s"
+            where += " AND status = %s"
             params.append(status_filter)
         
         # Sorting (allowlist to avoid SQL injection)
@@ -1442,20 +3442,23 @@ def admin_lab_assets(lab_id):
         sort_dir = 'ASC' if str(sort_order).lower() == 'asc' else 'DESC'
 
         # Count for pagination
-        count_query = query.replace('SELECT *', 'SELECT COUNT(*) AS cnt')
-        cursor.execute(count_query, params)
+        cursor.execute(f"SELECT COUNT(*) AS cnt FROM lab_assets WHERE {where}", params)
         total_assets = cursor.fetchone()['cnt']
 
-        # Add order and pagination
-        query += f" ORDER BY {sort_col} {sort_dir} LIMIT %s OFFSET %s"
+        # Add order and pagination; ranked search defaults to relevance order
+        query = f"SELECT * FROM lab_assets WHERE {where}"
+        if rank_sql and 'sort_by' not in request.args:
+            query += f" ORDER BY {rank_sql} DESC, created_at DESC LIMIT %s OFFSET %s"
+            params.extend(rank_params)
+        else:
+            query += f" ORDER BY {sort_col} {sort_dir} LIMIT %s OFFSET %s"
         params.extend([per_page, (page - 1) * per_page])
 
         cursor.execute(query, params)
         assets = cursor.fetchall()
         
         # Load categories for filters and add modal
-        cursor.execute("SELECT name FROM asset_categories ORDER BY name ASC")
-        categories = [row['name'] for row in cursor.fetchall()]
+        categories = _asset_categories(cursor)
         
     finally:
         cursor.close()
@@ -1516,9 +3519,15 @@ def admin_add_asset(lab_id):
             """,
             (lab_id, name, asset_code or None, category, status, purchase_date, description),
         )
+        bump_table_versions(cursor, 'lab_assets', *(() if category_row else ('asset_categories',)))
         connection.commit()
+        if not category_row:
+            _invalidate_asset_categories()
         log_admin_action('Add Asset', f'Added asset: {name} to lab #{lab_id}')
         flash('Asset added successfully!', 'success')
+    except mysql.connector.IntegrityError:
+        connection.rollback()
+        flash(f'Asset code {asset_code} already exists in this lab', 'error')
     except mysql.connector.Error as err:
         connection.rollback()
         logger.error(f"Add asset error: {err}")
@@ -1530,119 +3539,511 @@ def admin_add_asset(lab_id):
     return redirect(url_for('admin_lab_assets', lab_id=lab_id))
 
 
+class AssetImportError(Exception):
+    """An asset import file that cannot be processed; the message is shown to the admin"""
+
+    def __init__(self, message, category='error'):
+        super().__init__(message)
+        self.category = category
+
+
+ASSET_STATUSES = ('Available', 'In Use', 'Maintenance', 'Retired', 'Damaged')
+ASSET_STATUS_ALIASES = {
+    'available': 'Available',
+    'in use': 'In Use', 'in-use': 'In Use', 'in_use': 'In Use',
+    'maintenance': 'Maintenance', 'maint': 'Maintenance',
+    'retired': 'Retired', 'inactive': 'Retired',
+    'damaged': 'Damaged', 'broken': 'Damaged',
+}
+
+# Import column headers (case-insensitive) -> lab_assets fields
+ASSET_IMPORT_HEADERS = {
+    'asset name': 'name',
+    'asset code': 'asset_code',
+    'category': 'category',
+    'status': 'status',
+    'stock date': 'stock_date',
+    'description': 'description',
+}
+ASSET_IMPORT_REQUIRED = ('name', 'category', 'status')
+
+# Fields an import compares and, in upsert mode, overwrites for an existing asset code
+ASSET_COMPARE_FIELDS = ('name', 'category', 'status', 'stock_date', 'description')
+ASSET_IMPORT_MODES = ('skip', 'upsert')
+
+
+def _asset_header_map(headers):
+    """Map import fields to column indexes, raising AssetImportError if a required one is missing"""
+    header_map = {}
+    for idx, header in enumerate(headers):
+        key = str(header or '').strip().lower()
+        if key in ASSET_IMPORT_HEADERS:
+            header_map[ASSET_IMPORT_HEADERS[key]] = idx
+    for req in ASSET_IMPORT_REQUIRED:
+        if req not in header_map:
+            raise AssetImportError('Missing column in import file: ' + req.replace('_', ' ').title())
+    return header_map
+
+
+def _parse_stock_date(value):
+    """Return YYYY-MM-DD for a date/datetime or a YYYY-MM-DD / DD/MM/YYYY string, else None"""
+    if not value:
+        return None
+    try:
+        if hasattr(value, 'strftime'):
+            return value.strftime('%Y-%m-%d')
+        parts = str(value).strip().replace('/', '-').split('-')
+        if len(parts) == 3:
+            if len(parts[0]) == 4:
+                return f"{parts[0]}-{int(parts[1]):02d}-{int(parts[2]):02d}"
+            return f"{parts[2]}-{int(parts[1]):02d}-{int(parts[0]):02d}"
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
+def normalize_asset_row(raw):
+    """Clean one imported row ({field: raw value}); returns None for rows to skip.
+
+    Strings are trimmed, status variants map onto the enum (unknown values
+    become Available) and stock dates are normalized to YYYY-MM-DD.
+    """
+    def text(field):
+        value = raw.get(field)
+        return '' if value is None else str(value).strip()
+
+    name, category, status = text('name'), text('category'), text('status')
+    if not name or not category or not status:
+        return None
+    if status not in ASSET_STATUSES:
+        status = ASSET_STATUS_ALIASES.get(status.lower(), 'Available')
+    return {
+        'name': name,
+        'asset_code': text('asset_code') or None,
+        'category': category,
+        'status': status,
+        'stock_date': _parse_stock_date(raw.get('stock_date')),
+        'description': text('description'),
+    }
+
+
+def _xlsx_asset_rows(source):
+    """Open an .xlsx in read-only mode and return a generator of raw row dicts.
+
+    The header row is read and validated eagerly so format errors surface
+    before anything is written; data rows are then streamed from the sheet
+    XML without materializing the workbook.
+    """
+    try:
+        wb = load_workbook(source, read_only=True, data_only=True)
+    except Exception as e:
+        logger.error(f"Excel load error: {e}")
+        raise AssetImportError('Unable to read the Excel file. Please check the format.')
+    try:
+        rows = wb.active.iter_rows(values_only=True)
+        header_map = _asset_header_map(next(rows, ()))
+    except AssetImportError:
+        wb.close()
+        raise
+    except Exception as e:
+        wb.close()
+        logger.error(f"Excel load error: {e}")
+        raise AssetImportError('Unable to read the Excel file. Please check the format.')
+
+    def generate():
+        row_number = 1
+        try:
+            for row_number, row in enumerate(rows, 2):
+                yield {field: row[idx] if idx < len(row) else None for field, idx in header_map.items()}
+        except Exception as e:
+            logger.error(f"Excel read error at row {row_number}: {e}")
+            raise AssetImportError(f'Unable to read the Excel file past row {row_number}; '
+                                   'rows before it may already have been imported.')
+        finally:
+            wb.close()
+
+    return generate()
+
+
+def _open_text(source):
+    """Text stream over an upload path or binary file object (BOM-tolerant UTF-8)"""
+    if isinstance(source, (str, os.PathLike)):
+        return open(source, encoding='utf-8-sig', newline='')
+    return io.TextIOWrapper(getattr(source, 'stream', source), encoding='utf-8-sig', newline='')
+
+
+def _csv_asset_rows(source):
+    """Return a generator of raw row dicts from a CSV file with the template's header row"""
+    stream = _open_text(source)
+    reader = csv.reader(stream)
+    try:
+        header_map = _asset_header_map(next(reader, ()))
+    except AssetImportError:
+        stream.close()
+        raise
+    except (UnicodeDecodeError, csv.Error) as e:
+        stream.close()
+        logger.error(f"CSV load error: {e}")
+        raise AssetImportError('Unable to read the CSV file. Please save it as UTF-8 CSV.')
+
+    def generate():
+        try:
+            for row in reader:
+                yield {field: row[idx] if idx < len(row) else None for field, idx in header_map.items()}
+        except (UnicodeDecodeError, csv.Error) as e:
+            logger.error(f"CSV read error at line {reader.line_num}: {e}")
+            raise AssetImportError(f'Unable to read the CSV file past line {reader.line_num}; '
+                                   'rows before it may already have been imported.')
+        finally:
+            stream.close()
+
+    return generate()
+
+
+def _jsonl_asset_rows(source):
+    """Return a generator of raw row dicts from JSON lines, one object per line.
+
+    Keys may be field names (asset_code) or template headers (Asset Code).
+    """
+    aliases = dict(ASSET_IMPORT_HEADERS, **{field: field for field in ASSET_IMPORT_HEADERS.values()})
+    stream = _open_text(source)
+
+    def generate():
+        line_number = 0
+        try:
+            for line_number, line in enumerate(stream, 1):
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                if not isinstance(item, dict):
+                    raise ValueError('expected a JSON object')
+                yield {aliases[key.strip().lower()]: value for key, value in item.items()
+                       if key.strip().lower() in aliases}
+        except (UnicodeDecodeError, ValueError) as e:
+            logger.error(f"JSON lines read error at line {line_number}: {e}")
+            raise AssetImportError(f'Invalid JSON on line {line_number}; '
+                                   'rows before it may already have been imported.')
+        finally:
+            stream.close()
+
+    return generate()
+
+
+# Upload extension -> raw row reader; every reader feeds normalize_asset_row
+ASSET_IMPORT_READERS = {
+    '.xlsx': _xlsx_asset_rows,
+    '.csv': _csv_asset_rows,
+    '.jsonl': _jsonl_asset_rows,
+    '.ndjson': _jsonl_asset_rows,
+}
+
+
+def import_assets(connection, source, lab_id, file_format='.xlsx', progress=None, mode='skip'):
+    """Import assets from an upload path or file object.
+
+    `file_format` is a key of ASSET_IMPORT_READERS; `mode` is 'skip' (leave
+    existing asset codes alone) or 'upsert' (update them from the file). Rows stream from the
+    reader through normalize_asset_row into committed batches (see
+    _load_asset_rows), so memory stays bounded by IMPORT_CHUNK_SIZE.
+    Raises AssetImportError for unreadable or empty files.
+    """
+    rows = (normalize_asset_row(raw) for raw in ASSET_IMPORT_READERS[file_format](source))
+    result = _load_asset_rows(connection, lab_id, (row for row in rows if row), progress, mode)
+    if not result['rows']:
+        raise AssetImportError('No valid rows found in the file', 'info')
+    return result
+
+
+def _load_asset_rows(connection, lab_id, rows, progress=None, mode='skip'):
+    """Write normalized asset rows from any iterable in IMPORT_CHUNK_SIZE batches, committing each batch.
+
+    In 'skip' mode rows whose asset code already exists are left alone by ON
+    DUPLICATE KEY UPDATE id = id against the unique (lab_id, asset_code) key;
+    imports raise AssetImportError when that index is missing. In 'upsert' mode they
+    overwrite the existing asset through ON DUPLICATE KEY UPDATE; MySQL only
+    bumps updated_at when a value really changes, and the affected-row count
+    (2 per changed row, 0 per identical one) yields the updated/unchanged
+    split. One indexed lookup per batch finds the existing codes, including
+    those committed by earlier batches. A code repeated within a batch keeps
+    its last row in upsert mode and its first in skip mode.
+
+    A failure rolls back only the current batch, so earlier batches stay
+    imported. Returns counts plus elapsed seconds for the throughput report.
+    """
+    started = time.perf_counter()
+    columns = ('lab_id', 'name', 'asset_code', 'category', 'status', 'stock_date', 'description')
+    update_columns = ASSET_COMPARE_FIELDS if mode == 'upsert' else None
+    total = inserted = updated = unchanged = skipped = 0
+    skipped_codes = []
+    rows = iter(rows)
+    cursor = connection.cursor()
+    try:
+        if not _has_asset_code_index(cursor):
+            raise AssetImportError('Imports are disabled until duplicate asset codes are resolved '
+                                   'and the unique (lab_id, asset_code) index exists')
+        while True:
+            chunk = list(itertools.islice(rows, IMPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            total += len(chunk)
+            _insert_many(cursor, 'asset_categories', ('name',),
+                         [(category,) for category in sorted({r['category'] for r in chunk})], ignore=True)
+
+            existing = set()
+            codes = list({r['asset_code'] for r in chunk if r['asset_code']})
+            if codes:
+                placeholders = ','.join(['%s'] * len(codes))
+                cursor.execute(f"SELECT asset_code FROM lab_assets WHERE lab_id = %s AND asset_code IN ({placeholders})",
+                               [lab_id, *codes])
+                existing = {code for (code,) in cursor.fetchall()}
+
+            by_code = {}
+            values = []
+            for r in chunk:
+                code = r['asset_code']
+                row = (lab_id, r['name'], code, r['category'], r['status'], r['stock_date'], r['description'])
+                if code and code in by_code:
+                    skipped += 1
+                    if len(skipped_codes) < 100 and code not in skipped_codes:
+                        skipped_codes.append(code)
+                    if mode == 'upsert':
+                        values[by_code[code]] = row
+                    continue
+                if code:
+                    by_code[code] = len(values)
+                    if code in existing and mode == 'skip':
+                        skipped += 1
+                        if len(skipped_codes) < 100 and code not in skipped_codes:
+                            skipped_codes.append(code)
+                values.append(row)
+
+            affected = _insert_many(cursor, 'lab_assets', columns, values,
+                                    ignore=update_columns is None, update_columns=update_columns)
+            if update_columns:
+                matched = sum(1 for code in by_code if code in existing)
+                new_rows = len(values) - matched
+                changed = max(affected - new_rows, 0) // 2
+                inserted += new_rows
+                updated += changed
+                unchanged += matched - changed
+            else:
+                inserted += affected
+            bump_table_versions(cursor, 'lab_assets', 'asset_categories')
+            connection.commit()
+            if progress:
+                progress(total)
+    except Exception:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+        # Earlier chunks may have committed new categories even if a later one failed
+        _invalidate_asset_categories()
+
+    seconds = time.perf_counter() - started
+    logger.info(f"Asset import ({mode}) into lab #{lab_id}: {inserted} inserted, {updated} updated of {total} rows "
+                f"in {seconds:.2f}s ({total / seconds if seconds else 0:.0f} rows/s)")
+    return {'mode': mode, 'inserted': inserted, 'updated': updated, 'unchanged': unchanged,
+            'skipped': skipped, 'skipped_codes': skipped_codes, 'rows': total, 'seconds': seconds}
+
+
+def _import_summary(result):
+    """Human-readable outcome of import_assets()"""
+    rate = result['rows'] / result['seconds'] if result['seconds'] else 0
+    msg = f"Imported {result['inserted']} asset(s) in {result['seconds']:.1f}s ({rate:.0f} rows/s)."
+    if result['mode'] == 'upsert':
+        msg += f" Updated {result['updated']}, unchanged {result['unchanged']}."
+    if result['skipped']:
+        codes = result['skipped_codes']
+        label = 'repeated' if result['mode'] == 'upsert' else 'duplicate'
+        msg += f" Skipped {result['skipped']} {label} Asset Code(s): {', '.join(codes[:10])}"
+        if len(codes) > 10:
+            msg += " ..."
+    return msg
+
+
+def _import_audit_details(result, lab_id):
+    details = f"Imported {result['inserted']} assets to lab #{lab_id}"
+    if result['mode'] == 'upsert':
+        details += f"; updated {result['updated']}, unchanged {result['unchanged']}"
+    return details + f"; skipped {result['skipped']} duplicates"
+
+
+_PREVIEW_KEY_RE = re.compile(r'[0-9a-f]{64}')
+
+
+def _preview_path(key, lab_id, owner):
+    """Cache file of an upload's parsed rows, private to one lab and one admin.
+
+    The file name is derived from all three, so a key used with another
+    lab_id or by another admin resolves to a file that does not exist.
+    """
+    name = hashlib.sha256(f"{lab_id}\0{owner}\0{key}".encode()).hexdigest()
+    return os.path.join(JOB_DIR, 'previews', name + '.jsonl')
+
+
+def _fresh_preview_path(key, lab_id, owner):
+    """Path of a cached preview still within IMPORT_PREVIEW_TTL_MINUTES, or None"""
+    if not _PREVIEW_KEY_RE.fullmatch(key):
+        return None
+    path = _preview_path(key, lab_id, owner)
+    try:
+        age = time.time() - os.path.getmtime(path)
+    except OSError:
+        return None
+    return path if age < IMPORT_PREVIEW_TTL_MINUTES * 60 else None
+
+
+def cache_import_rows(file, file_format, lab_id, owner):
+    """Parse and normalize an upload once into a JSON-lines cache; returns its key.
+
+    The key is the SHA-256 of the upload and the cache file is private to
+    the target lab and the uploading admin (see _preview_path), so the same
+    admin re-submitting the same file for the same lab within
+    IMPORT_PREVIEW_TTL_MINUTES reuses the parsed rows instead of parsing
+    again, while other labs and admins get entries of their own.
+    """
+    _init_job_store()
+    stream = getattr(file, 'stream', file)
+    digest = hashlib.sha256(file_format.encode())
+    for block in iter(lambda: stream.read(1 << 20), b''):
+        digest.update(block)
+    stream.seek(0)
+    key = digest.hexdigest()
+    path = _preview_path(key, lab_id, owner)
+    if os.path.exists(path) and time.time() - os.path.getmtime(path) < IMPORT_PREVIEW_TTL_MINUTES * 60:
+        os.utime(path)
+        return key
+
+    partial = path + '.part'
+    try:
+        with open(partial, 'w', encoding='utf-8') as output:
+            for raw in ASSET_IMPORT_READERS[file_format](file):
+                row = normalize_asset_row(raw)
+                if row:
+                    output.write(json.dumps(row) + '\n')
+        os.replace(partial, path)
+    finally:
+        if os.path.exists(partial):
+            os.remove(partial)
+    return key
+
+
+def _asset_compare_values(row):
+    return tuple('' if row[field] is None else str(row[field]) for field in ASSET_COMPARE_FIELDS)
+
+
+def preview_import(connection, lab_id, path, mode='skip', sample_size=20):
+    """Classify cached import rows against the lab's current assets without writing.
+
+    The lab's coded assets are read with one range scan of the unique
+    (lab_id, asset_code) index. Rows are counted as inserts (new or uncoded),
+    updates (existing code, different values), unchanged or duplicate (code
+    repeated within the file); up to sample_size rows of each are returned.
+    Like _load_asset_rows, a repeated code is represented by its first row
+    in 'skip' mode and by its last row in 'upsert' mode.
+    """
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    try:
+        cursor.execute("""
+            SELECT asset_code, name, category, status, DATE_FORMAT(stock_date, '%Y-%m-%d') AS stock_date, description
+            FROM lab_assets WHERE lab_id = %s AND asset_code IS NOT NULL
+        """, (lab_id,))
+        existing = {row['asset_code']: _asset_compare_values(row) for row in _iter_rows(cursor)}
+    finally:
+        cursor.close()
+
+    # Line number of the row that represents each code
+    kept = {}
+    if mode == 'upsert':
+        with open(path, encoding='utf-8') as cached:
+            for number, line in enumerate(cached):
+                code = json.loads(line)['asset_code']
+                if code:
+                    kept[code] = number
+
+    counts = {'insert': 0, 'update': 0, 'unchanged': 0, 'duplicate': 0}
+    samples = {kind: [] for kind in counts}
+    with open(path, encoding='utf-8') as cached:
+        for number, line in enumerate(cached):
+            row = json.loads(line)
+            code = row['asset_code']
+            if code and kept.setdefault(code, number) != number:
+                kind = 'duplicate'
+            elif code and code in existing:
+                current = existing[code]
+                values = _asset_compare_values(row)
+                row['changes'] = [field for field, old, new in zip(ASSET_COMPARE_FIELDS, current, values) if old != new]
+                kind = 'update' if row['changes'] else 'unchanged'
+            else:
+                kind = 'insert'
+            counts[kind] += 1
+            if len(samples[kind]) < sample_size:
+                samples[kind].append(row)
+    return counts, samples
+
+
 @app.route('/admin/labs/<int:lab_id>/assets/import', methods=['POST'])
 @admin_required
 def admin_import_assets(lab_id):
-    """Import assets from an Excel file and skip duplicates by asset_code"""
+    """Import assets from an Excel, CSV or JSON-lines file; existing asset codes are skipped or, with mode=upsert, updated"""
     file = request.files.get('file')
     if not file or file.filename == '':
-        flash('Please choose an Excel (.xlsx) file to upload', 'error')
+        flash('Please choose an Excel (.xlsx), CSV or JSON-lines file to upload', 'error')
         return redirect(url_for('admin_lab_assets', lab_id=lab_id))
 
-    if not file.filename.lower().endswith('.xlsx'):
-        flash('Invalid file type. Please upload a .xlsx Excel file', 'error')
+    file_format = os.path.splitext(file.filename)[1].lower()
+    if file_format not in ASSET_IMPORT_READERS:
+        flash('Invalid file type. Please upload a .xlsx, .csv or .jsonl file', 'error')
         return redirect(url_for('admin_lab_assets', lab_id=lab_id))
 
-    try:
-        wb = load_workbook(file, data_only=True)
-        ws = wb.active
-    except Exception as e:
-        logger.error(f"Excel load error: {e}")
-        flash('Unable to read the Excel file. Please check the format.', 'error')
-        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+    mode = request.form.get('mode', 'skip')
+    if mode not in ASSET_IMPORT_MODES:
+        mode = 'skip'
 
-    # Expected headers (case-insensitive match)
-    expected_headers = {
-        'asset name': 'name',
-        'asset code': 'asset_code',
-        'category': 'category',
-        'status': 'status',
-        'stock date': 'stock_date',
-        'description': 'description',
-    }
+    if request.form.get('preview') == '1':
+        try:
+            key = cache_import_rows(file, file_format, lab_id, session.get('admin_username'))
+        except AssetImportError as err:
+            flash(str(err), err.category)
+            return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+        return redirect(url_for('admin_import_preview', lab_id=lab_id, key=key, mode=mode))
 
-    # Read header row and map columns
-    header_cells = [str(c.value or '').strip() for c in next(ws.iter_rows(min_row=1, max_row=1, values_only=False))]
-    header_map = {}
-    for idx, header in enumerate(header_cells):
-        key = header.lower()
-        if key in expected_headers:
-            header_map[expected_headers[key]] = idx
+    if request.form.get('background') == '1':
+        job_id = submit_job('import_assets', {'lab_id': lab_id, 'file_format': file_format, 'mode': mode}, upload=file)
+        return _job_submitted(job_id, url_for('admin_lab_assets', lab_id=lab_id))
 
-    # Validate required minimal headers
-    for req in ('name', 'category', 'status'):
-        if req not in header_map:
-            flash('Missing column in Excel: ' + req.replace('_', ' ').title(), 'error')
-            return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
 
-    # Read rows
-    rows = []
-    for row in ws.iter_rows(min_row=2, values_only=True):
-        def get(col):
-            if col not in header_map:
-                return ''
-            val = row[header_map[col]]
-            return '' if val is None else str(val).strip()
-
-        name = get('name')
-        asset_code = get('asset_code')
-        category = get('category')
-        status = get('status')
-        stock_date_raw = row[header_map['stock_date']] if 'stock_date' in header_map else None
-        description = get('description')
-
-        if not name or not category or not status:
-            continue
+    try:
+        result = import_assets(connection, file, lab_id, file_format, mode=mode)
+        flash(_import_summary(result), 'success')
+        log_admin_action('Import Assets', _import_audit_details(result, lab_id))
+    except AssetImportError as err:
+        flash(str(err), err.category)
+    except mysql.connector.Error as err:
+        logger.error(f"Import assets DB error: {err}")
+        flash('Error importing assets. Please check the file and try again.', 'error')
+    finally:
+        connection.close()
 
-        # Normalize status
-        valid_status = {'Available', 'In Use', 'Maintenance', 'Retired', 'Damaged'}
-        if status not in valid_status:
-            # Attempt to normalize common variants
-            s = status.strip().lower()
-            if s in ('available',):
-                status = 'Available'
-            elif s in ('in use', 'in-use', 'in_use'):
-                status = 'In Use'
-            elif s in ('maintenance', 'maint'):
-                status = 'Maintenance'
-            elif s in ('retired', 'inactive'):
-                status = 'Retired'
-            elif s in ('damaged', 'broken'):
-                status = 'Damaged'
-            else:
-                # default to Available if unrecognized
-                status = 'Available'
+    return redirect(url_for('admin_lab_assets', lab_id=lab_id))
 
-        # Parse date to YYYY-MM-DD if possible
-        stock_date = None
-        if stock_date_raw:
-            try:
-                if hasattr(stock_date_raw, 'strftime'):
-                    stock_date = stock_date_raw.strftime('%Y-%m-%d')
-                else:
-                    # try parse as string YYYY-MM-DD or DD/MM/YYYY
-                    txt = str(stock_date_raw).strip().replace('/', '-')
-                    parts = txt.split('-')
-                    if len(parts) == 3:
-                        if len(parts[0]) == 4:
-                            stock_date = f"{parts[0]}-{int(parts[1]):02d}-{int(parts[2]):02d}"
-                        else:
-                            stock_date = f"{parts[2]}-{int(parts[1]):02d}-{int(parts[0]):02d}"
-            except Exception:
-                stock_date = None
-
-        rows.append({
-            'name': name,
-            'asset_code': asset_code or None,
-            'category': category,
-            'status': status,
-            'stock_date': stock_date,
-            'description': description,
-        })
 
-    if not rows:
-        flash('No valid rows found in the Excel file', 'info')
+@app.route('/admin/labs/<int:lab_id>/assets/import/preview/<key>')
+@admin_required
+def admin_import_preview(lab_id, key):
+    """Show what confirming a cached import would insert, update or skip"""
+    path = _fresh_preview_path(key, lab_id, session.get('admin_username'))
+    if not path:
+        flash('That import preview has expired. Please upload the file again.', 'error')
         return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+    mode = request.args.get('mode', 'skip')
+    if mode not in ASSET_IMPORT_MODES:
+        mode = 'skip'
 
     connection = get_db_connection()
     if not connection:
@@ -1650,59 +4051,60 @@ def admin_import_assets(lab_id):
         return redirect(url_for('admin_lab_assets', lab_id=lab_id))
 
     cursor = connection.cursor(dictionary=True)
-    inserted = 0
-    skipped_codes = []
     try:
-        # Ensure all categories exist
-        categories_needed = sorted({r['category'] for r in rows})
-        for cat in categories_needed:
-            cursor.execute("SELECT id FROM asset_categories WHERE name = %s", (cat,))
-            if not cursor.fetchone():
-                cursor.execute("INSERT INTO asset_categories (name) VALUES (%s)", (cat,))
-
-        # Preload existing asset codes for this lab
-        codes = [r['asset_code'] for r in rows if r['asset_code']]
-        existing_codes = set()
-        if codes:
-            format_strings = ','.join(['%s'] * len(codes))
-            cursor.execute(f"SELECT asset_code FROM lab_assets WHERE lab_id = %s AND asset_code IN ({format_strings})", [lab_id, *codes])
-            existing_codes = {row['asset_code'] for row in cursor.fetchall() if row['asset_code']}
-
-        # Track duplicates in file itself
-        seen_codes = set()
-
-        for r in rows:
-            code = r['asset_code']
-            if code:
-                if code in existing_codes or code in seen_codes:
-                    skipped_codes.append(code)
-                    continue
-                seen_codes.add(code)
-
-            cursor.execute(
-                """
-                INSERT INTO lab_assets (lab_id, name, asset_code, category, status, stock_date, description)
-                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                """,
-                (lab_id, r['name'], r['asset_code'], r['category'], r['status'], r['stock_date'], r['description'])
-            )
-            inserted += 1
+        cursor.execute("SELECT * FROM laboratory WHERE id = %s", (lab_id,))
+        lab = cursor.fetchone()
+        if not lab:
+            flash('Laboratory not found', 'error')
+            return redirect(url_for('admin_inventory'))
+        counts, samples = preview_import(connection, lab_id, path, mode)
+    except mysql.connector.Error as err:
+        logger.error(f"Import preview error: {err}")
+        flash('Error preparing the import preview', 'error')
+        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+    finally:
+        cursor.close()
+        connection.close()
 
-        connection.commit()
-        msg = f"Imported {inserted} asset(s)."
-        if skipped_codes:
-            unique_skipped = sorted(set(skipped_codes))
-            msg += f" Skipped {len(unique_skipped)} duplicate Asset Code(s): {', '.join(unique_skipped[:10])}"
-            if len(unique_skipped) > 10:
-                msg += " ..."
-        flash(msg, 'success')
-        log_admin_action('Import Assets', f'Imported {inserted} assets to lab #{lab_id}; skipped {len(set(skipped_codes))} duplicates')
+    return render_template('admin/import_preview.html', lab=lab, key=key, counts=counts, samples=samples,
+                           compare_fields=ASSET_COMPARE_FIELDS, mode=mode)
+
+
+@app.route('/admin/labs/<int:lab_id>/assets/import/preview/<key>/confirm', methods=['POST'])
+@admin_required
+def admin_import_confirm(lab_id, key):
+    """Import a previously previewed upload from its cache, without parsing the file again"""
+    path = _fresh_preview_path(key, lab_id, session.get('admin_username'))
+    if not path:
+        flash('That import preview has expired. Please upload the file again.', 'error')
+        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+
+    mode = request.form.get('mode', 'skip')
+    if mode not in ASSET_IMPORT_MODES:
+        mode = 'skip'
+
+    if request.form.get('background') == '1':
+        # The job owns the cached rows from here and removes them when it finishes
+        job_id = submit_job('import_assets', {'lab_id': lab_id, 'file_format': '.jsonl', 'upload': path, 'mode': mode})
+        return _job_submitted(job_id, url_for('admin_lab_assets', lab_id=lab_id))
+
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+
+    try:
+        # Cached rows are already normalized JSON lines; normalize_asset_row leaves them unchanged
+        result = import_assets(connection, path, lab_id, '.jsonl', mode=mode)
+        os.remove(path)
+        flash(_import_summary(result), 'success')
+        log_admin_action('Import Assets', _import_audit_details(result, lab_id) + ' (from preview)')
+    except AssetImportError as err:
+        flash(str(err), err.category)
     except mysql.connector.Error as err:
-        connection.rollback()
         logger.error(f"Import assets DB error: {err}")
         flash('Error importing assets. Please check the file and try again.', 'error')
     finally:
-        cursor.close()
         connection.close()
 
     return redirect(url_for('admin_lab_assets', lab_id=lab_id))
@@ -1712,6 +4114,23 @@ def admin_import_assets(lab_id):
 @admin_required
 def admin_assets_template(lab_id):
     """Download a simple Excel template for importing assets"""
+    data, etag = _asset_template()
+    response = send_file(
+        io.BytesIO(data),
+        mimetype=XLSX_MIMETYPE,
+        as_attachment=True,
+        download_name='assets_import_template.xlsx',
+        etag=etag,
+        conditional=True,
+    )
+    if response.status_code == 200:
+        log_admin_action('Download Assets Template', f'Lab #{lab_id} template downloaded')
+    return response
+
+
+@lru_cache(maxsize=1)
+def _asset_template():
+    """The import template workbook and its strong ETag, built once per process"""
     wb = Workbook()
     ws = wb.active
     ws.title = "Assets"
@@ -1751,172 +4170,495 @@ def admin_assets_template(lab_id):
 
     output = io.BytesIO()
     wb.save(output)
-    output.seek(0)
+    data = output.getvalue()
+    # The zip container embeds the save time; hash the headers and sample row so every process agrees
+    etag = hashlib.sha256(json.dumps([headers, [c.value for c in ws[2]]]).encode('utf-8')).hexdigest()
+    return data, etag
+
+
+# Asset filters understood by the lab page, the cross-lab search and every asset export
+ASSET_FILTER_KEYS = ('search', 'category_filter', 'status_filter', 'lab_filter', 'code', 'stock_from', 'stock_to')
+
+
+def _filter_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
 
-    log_admin_action('Download Assets Template', f'Lab #{lab_id} template downloaded')
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name='assets_import_template.xlsx'
-    )
 
+def _asset_filter_conditions(lab_id, filters):
+    """Build (conditions, params) for asset filters; unparseable values are ignored.
 
-def _fetch_assets_for_export(cursor, lab_id, request_args, selected_ids=None):
-    """Helper to fetch assets by selected IDs or current filters."""
-    params = [lab_id]
-    query = "SELECT * FROM lab_assets WHERE lab_id = %s"
+    lab_id pins one lab; with lab_id=None the optional lab_filter applies.
+    `code` matches an asset code prefix, stock_from/stock_to bound stock_date.
+    lab_id, category and status lead composite (column, created_at, id)
+    indexes, so those scans stay in keyset order; asset_code and stock_date
+    only have single-column indexes, so range filters on them sort the
+    matching rows.
+    """
+    conditions = []
+    params = []
+    if lab_id is None and str(filters.get('lab_filter', '')).isdigit():
+        lab_id = int(filters['lab_filter'])
+    if lab_id is not None:
+        conditions.append("lab_id = %s")
+        params.append(lab_id)
 
+    search = filters.get('search', '')
+    if search:
+        search_sql, search_params, _, _ = _search_clause(search, ASSET_SEARCH_COLUMNS)
+        conditions.append(search_sql)
+        params.extend(search_params)
+    code = filters.get('code', '').strip()
+    if code:
+        conditions.append("asset_code LIKE %s")
+        params.append(code.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+    if filters.get('category_filter'):
+        conditions.append("category = %s")
+        params.append(filters['category_filter'])
+    if filters.get('status_filter'):
+        conditions.append("status = %s")
+        params.append(filters['status_filter'])
+    stock_from = _filter_date(filters.get('stock_from'))
+    if stock_from:
+        conditions.append("stock_date >= %s")
+        params.append(stock_from)
+    stock_to = _filter_date(filters.get('stock_to'))
+    if stock_to:
+        conditions.append("stock_date <= %s")
+        params.append(stock_to)
+    return conditions, params
+
+
+def _assets_export_query(lab_id, request_args, selected_ids=None, columns='*'):
+    """Build (query, params) for assets by selected IDs or current filters.
+
+    lab_id=None spans every lab, grouped by lab in (lab_id, created_at, id)
+    index order so exports stream without a filesort.
+    """
     # If explicit IDs provided, take precedence
     if selected_ids:
+        conditions, params = _asset_filter_conditions(lab_id, {})
         placeholders = ','.join(['%s'] * len(selected_ids))
-        query += f" AND id IN ({placeholders})"
+        conditions.append(f"id IN ({placeholders})")
         params.extend(selected_ids)
     else:
-        search = request_args.get('search', '')
-        category_filter = request_args.get('category_filter', '')
-        status_filter = request_args.get('status_filter', '')
-        if search:
-            query += " AND (name LIKE %s OR asset_code LIKE %s OR description LIKE %s)"
-            like = f"%{search}%"
-            params.extend([like, like, like])
-        if category_filter:
-            query += " AND category = %s"
-            params.append(category_filter)
-        if status_filter:
-            query += " AND status = %s"
-            params.append(status_filter)
+        conditions, params = _asset_filter_conditions(lab_id, request_args)
+
+    query = f"SELECT {columns} FROM lab_assets"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY created_at DESC" if lab_id is not None else " ORDER BY lab_id, created_at, id"
+    return query, params
+
+
+ASSET_EXPORT_COLUMNS = 'id, name, asset_code, category, status, stock_date, description, created_at, updated_at'
+ASSET_EXPORT_HEADERS = ['Asset ID', 'Asset Name', 'Asset Code', 'Category', 'Status', 'Stock Date', 'Description', 'Created At', 'Updated At']
+
+
+_LAB_NAME_COLUMN = "(SELECT name FROM laboratory WHERE laboratory.id = lab_assets.lab_id) AS lab_name"
+
+
+def export_assets_xlsx(connection, output, lab_id, filters, asset_ids=None, progress=None):
+    """Write selected or filtered assets to an .xlsx file object; returns the row count.
+
+    lab_id=None exports every lab, with a leading Lab column.
+    """
+    columns, headers = ASSET_EXPORT_COLUMNS, ASSET_EXPORT_HEADERS
+    if lab_id is None:
+        columns, headers = f"{_LAB_NAME_COLUMN}, {columns}", ['Lab'] + headers
+    cursor = connection.cursor(buffered=False)
+    try:
+        query, params = _assets_export_query(lab_id, filters, asset_ids or None, columns)
+        cursor.execute(query, params)
+        return write_xlsx(output, "Assets", headers, _with_progress(_iter_rows(cursor), progress))
+    finally:
+        cursor.close()
+
+
+def write_pdf_report(output, title, headers, rows, col_widths, wrap_columns=(), progress=None):
+    """Stream rows into a landscape A4 PDF table, laying out one page at a time.
+
+    Rows are pulled from the iterable into a small Table (at most
+    PDF_TABLE_ROWS rows, sized from what fitted on the previous page) that is
+    cut back to the rows that fit the page; the overflow carries onto the
+    next page.
+    Layout cost therefore stays linear in the row count and only one page of
+    flowables is alive at once. `col_widths` are fractions of the
+    printable width. Cells in `wrap_columns` that will not fit on one line
+    become Paragraphs (capped at PDF_CELL_CHARS); everything else stays a
+    plain string, which is much cheaper to lay out. Returns the row count.
+    """
+    from xml.sax.saxutils import escape, unescape
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Paragraph, Table, TableStyle
+
+    page_width, page_height = landscape(A4)
+    margin = 36
+    avail_width = page_width - 2 * margin
+    widths = [fraction * avail_width for fraction in col_widths]
+    styles = getSampleStyleSheet()
+    cell_style = styles['BodyText'].clone('PdfCell', fontSize=8, leading=10)
+    # Helvetica 8pt averages about 4.4pt per character
+    line_chars = [int((width - 6) / 4.4) for width in widths]
+    wrap = set(wrap_columns)
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ])
+
+    def cells(row):
+        out = []
+        for idx, value in enumerate(row):
+            text = '' if value is None else str(value)
+            if idx in wrap and len(text) > line_chars[idx]:
+                if len(text) > PDF_CELL_CHARS:
+                    text = text[:PDF_CELL_CHARS] + '...'
+                out.append(Paragraph(escape(text), cell_style))
+            else:
+                out.append(text)
+        return out
+
+    canvas = Canvas(output, pagesize=(page_width, page_height))
+    canvas.setTitle(title)
+    heading = Paragraph(escape(title), styles['Heading2'])
+    _, heading_height = heading.wrap(avail_width, page_height)
+    rows = iter(rows)
+    pending = []
+    exhausted = False
+    count = 0
+    page = 0
+    # Rows per layout attempt: doubles while the page still has room and drops
+    # to what fitted last after a split, so tall rows are not laid out repeatedly
+    batch = 16
+    while True:
+        while not exhausted and len(pending) < batch:
+            row = next(rows, None)
+            if row is None:
+                exhausted = True
+            else:
+                pending.append(cells(row))
+                count += 1
+        if not pending and page:
+            break
+
+        top = page_height - margin - (0 if page else heading_height + 6)
+        avail_height = top - margin - 14
+        table = Table([headers] + pending, colWidths=widths, repeatRows=1, style=table_style)
+        _, height = table.wrap(avail_width, avail_height)
+        if height <= avail_height and not exhausted and batch < PDF_TABLE_ROWS:
+            batch = min(batch * 2, PDF_TABLE_ROWS)
+            continue
+        if height > avail_height:
+            # Longest prefix of pending that fits, by bisection over at most PDF_TABLE_ROWS rows
+            fitted, too_many = 0, len(pending)
+            while too_many - fitted > 1:
+                middle = (fitted + too_many) // 2
+                _, height = Table([headers] + pending[:middle], colWidths=widths,
+                                  style=table_style).wrap(avail_width, avail_height)
+                if height <= avail_height:
+                    fitted = middle
+                else:
+                    too_many = middle
+            if not fitted:
+                # One row taller than a whole page: cut its wrapped cells to a single line
+                pending[0] = [unescape(cell.text)[:line_chars[idx]] if isinstance(cell, Paragraph) else cell
+                              for idx, cell in enumerate(pending[0])]
+                fitted = 1
+            table = Table([headers] + pending[:fitted], colWidths=widths, repeatRows=1, style=table_style)
+            _, height = table.wrap(avail_width, avail_height)
+            pending = pending[fitted:]
+            batch = min(fitted + 2, PDF_TABLE_ROWS)
+        else:
+            pending = []
+
+        page += 1
+        if page == 1:
+            heading.drawOn(canvas, margin, page_height - margin - heading_height)
+        table.drawOn(canvas, margin, top - height)
+        canvas.setFont('Helvetica', 8)
+        footer = f"Page {page}"
+        if exhausted and not pending:
+            footer = f"{count} rows - " + footer
+        canvas.drawRightString(page_width - margin, margin - 12, footer)
+        canvas.showPage()
+        if progress:
+            progress(count)
+
+    canvas.save()
+    return count
+
+
+ASSET_PDF_COLUMNS = 'id, name, asset_code, category, status, stock_date, description'
+ASSET_PDF_HEADERS = ['Asset ID', 'Asset Name', 'Asset Code', 'Category', 'Status', 'Stock Date', 'Description']
+ASSET_PDF_WIDTHS = (0.06, 0.18, 0.13, 0.12, 0.08, 0.08, 0.35)
+
+
+def export_assets_pdf(connection, output, lab_id, filters, asset_ids=None, progress=None):
+    """Render selected or filtered assets as a paginated PDF report; returns the row count.
+
+    lab_id=None produces a cross-lab report with a leading Lab column.
+    Raises ImportError when reportlab is not installed.
+    """
+    columns, headers, widths = ASSET_PDF_COLUMNS, ASSET_PDF_HEADERS, ASSET_PDF_WIDTHS
+    cursor = connection.cursor(buffered=False)
+    try:
+        if lab_id is None:
+            title = "All Labs Assets Report"
+            columns = f"{_LAB_NAME_COLUMN}, {columns}"
+            headers = ['Lab'] + headers
+            widths = (0.12, 0.05, 0.16, 0.11, 0.10, 0.07, 0.07, 0.32)
+        else:
+            cursor.execute("SELECT name FROM laboratory WHERE id = %s", (lab_id,))
+            lab = cursor.fetchone()
+            title = f"{lab[0] if lab else f'Lab {lab_id}'} Assets Report"
+        title += f" ({datetime.now().strftime('%Y-%m-%d %H:%M')})"
+        query, params = _assets_export_query(lab_id, filters, asset_ids or None, columns)
+        cursor.execute(query, params)
+        wrap_columns = [idx for idx, header in enumerate(headers) if header in ('Lab', 'Asset Name', 'Description')]
+        return write_pdf_report(output, title, headers, _iter_rows(cursor), widths, wrap_columns, progress)
+    finally:
+        cursor.close()
 
-    query += " ORDER BY created_at DESC"
-    cursor.execute(query, params)
-    return cursor.fetchall()
+
+def _count_assets_for_export(connection, lab_id, filters, asset_ids=None):
+    cursor = connection.cursor()
+    try:
+        query, params = _assets_export_query(lab_id, filters, asset_ids or None, 'COUNT(*)')
+        cursor.execute(query.rsplit(' ORDER BY ', 1)[0], params)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def _asset_export_filters(args):
+    """The asset filters an export request carries, as a plain dict for jobs"""
+    return {key: args.get(key, '') for key in ASSET_FILTER_KEYS}
 
 
 @app.route('/admin/labs/<int:lab_id>/assets/export/excel')
 @admin_required
 def admin_export_assets_excel(lab_id):
-    """Export selected or filtered assets to Excel"""
+    """Export selected or filtered assets to Excel (add background=1 to queue it as a job)"""
     # Parse selected IDs from query
     asset_ids = request.args.getlist('asset_ids', type=int)
 
+    if request.args.get('background') == '1':
+        job_id = submit_job('export_assets_excel', {
+            'lab_id': lab_id, 'filters': _asset_export_filters(request.args), 'asset_ids': asset_ids,
+        })
+        return _job_submitted(job_id, url_for('admin_lab_assets', lab_id=lab_id))
+
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
         return redirect(url_for('admin_lab_assets', lab_id=lab_id))
 
+    output = tempfile.TemporaryFile()
+    try:
+        count = export_assets_xlsx(connection, output, lab_id, request.args, asset_ids)
+    except mysql.connector.Error as err:
+        output.close()
+        logger.error(f"Export assets error: {err}")
+        flash('Error exporting assets', 'error')
+        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+    finally:
+        connection.close()
+
+    log_admin_action('Export Assets Excel', f'Lab #{lab_id} exported {count} assets to Excel')
+    return _send_xlsx(output, f'lab_{lab_id}_assets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx')
+
+
+ASSET_SEARCH_PAGE_SIZE = 50
+
+
+@app.route('/admin/assets')
+@admin_required
+def admin_assets_search():
+    """Organization-wide asset search across every lab.
+
+    Filters: search, code (asset code prefix), lab_filter, category_filter,
+    status_filter, stock_from / stock_to (YYYY-MM-DD). Results are keyset
+    paginated newest first with ?after= cursor tokens on (created_at, id);
+    JSON is returned to clients that ask for it (Accept or ?format=json).
+    """
+    filters = _asset_export_filters(request.args)
+    after = _decode_cursor(request.args.get('after', ''))
+    wants_json = request.args.get('format') == 'json' or request.accept_mimetypes.best == 'application/json'
+
+    connection = get_db_connection()
+    if not connection:
+        if wants_json:
+            return jsonify({'error': 'Database connection error'}), 503
+        flash('Database connection error', 'error')
+        return redirect(url_for('admin_inventory'))
+
+    conditions, params = _asset_filter_conditions(None, filters)
+    if after:
+        conditions.append("(created_at < %s OR (created_at = %s AND id < %s))")
+        params.extend([after[0], after[0], after[1]])
+    query = f"""
+        SELECT id, lab_id, {_LAB_NAME_COLUMN}, name, asset_code, category, status, stock_date, description, created_at
+        FROM lab_assets {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        ORDER BY created_at DESC, id DESC LIMIT %s
+    """
     cursor = connection.cursor(dictionary=True)
     try:
-        assets = _fetch_assets_for_export(cursor, lab_id, request.args, asset_ids or None)
+        cursor.execute(query, params + [ASSET_SEARCH_PAGE_SIZE + 1])
+        assets = cursor.fetchall()
+        labs = categories = []
+        if not wants_json:
+            cursor.execute("SELECT id, name FROM laboratory ORDER BY name")
+            labs = cursor.fetchall()
+            categories = _asset_categories(cursor)
+    except mysql.connector.Error as err:
+        logger.error(f"Asset search error: {err}")
+        if wants_json:
+            return jsonify({'error': 'Search failed'}), 500
+        flash('Error searching assets', 'error')
+        return redirect(url_for('admin_inventory'))
     finally:
         cursor.close()
         connection.close()
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Assets"
+    has_next = len(assets) > ASSET_SEARCH_PAGE_SIZE
+    assets = assets[:ASSET_SEARCH_PAGE_SIZE]
+    next_cursor = _encode_cursor(assets[-1]['created_at'], assets[-1]['id']) if has_next else None
 
-    headers = ['Asset ID', 'Asset Name', 'Asset Code', 'Category', 'Status', 'Stock Date', 'Description', 'Created At', 'Updated At']
-    header_font = Font(bold=True)
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = header_font
+    if wants_json:
+        for asset in assets:
+            asset['stock_date'] = asset['stock_date'].isoformat() if asset['stock_date'] else None
+            asset['created_at'] = asset['created_at'].isoformat()
+        return jsonify({'assets': assets, 'next_cursor': next_cursor})
 
-    for row_idx, a in enumerate(assets, start=2):
-        ws.cell(row=row_idx, column=1, value=a['id'])
-        ws.cell(row=row_idx, column=2, value=a['name'])
-        ws.cell(row=row_idx, column=3, value=a.get('asset_code'))
-        ws.cell(row=row_idx, column=4, value=a['category'])
-        ws.cell(row=row_idx, column=5, value=a['status'])
-        ws.cell(row=row_idx, column=6, value=a.get('stock_date'))
-        ws.cell(row=row_idx, column=7, value=a.get('description'))
-        ws.cell(row=row_idx, column=8, value=a.get('created_at'))
-        ws.cell(row=row_idx, column=9, value=a.get('updated_at'))
-
-    # Auto size
-    for column in ws.columns:
-        max_length = 0
-        column_letter = column[0].column_letter
-        for cell in column:
-            try:
-                max_length = max(max_length, len(str(cell.value)))
-            except Exception:
-                pass
-        ws.column_dimensions[column_letter].width = min(max_length + 2, 50)
+    active_filters = {key: value for key, value in filters.items() if value}
+    return render_template('admin/assets_search.html', assets=assets, filters=filters,
+                           active_filters=active_filters, labs=labs, categories=categories,
+                           statuses=ASSET_STATUSES, next_cursor=next_cursor, paged=bool(after))
 
-    output = io.BytesIO()
-    wb.save(output)
-    output.seek(0)
 
-    log_admin_action('Export Assets Excel', f'Lab #{lab_id} exported {len(assets)} assets to Excel')
-    return send_file(
-        output,
-        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-        as_attachment=True,
-        download_name=f'lab_{lab_id}_assets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+@app.route('/admin/assets/export/csv')
+@admin_required
+def admin_export_all_assets_csv():
+    """Stream matching assets from every lab as CSV (same filters as the cross-lab search)"""
+    filters = _asset_export_filters(request.args)
+    query, params = _assets_export_query(None, filters, columns=f"{_LAB_NAME_COLUMN}, {ASSET_EXPORT_COLUMNS}")
+
+    # The stream outlives the request context, so it gets its own connection
+    try:
+        connection = db_pool.acquire()
+    except mysql.connector.Error as err:
+        logger.error(f"Database connection error: {err}")
+        flash('Database connection error', 'error')
+        return redirect(url_for('admin_assets_search', **filters))
+
+    described = ', '.join(f"{key}={value}" for key, value in filters.items() if value)
+    log_admin_action('Export Assets CSV', f"All labs exported to CSV{' (' + described + ')' if described else ''}")
+
+    response = Response(_stream_csv(connection, ['Lab'] + ASSET_EXPORT_HEADERS, query, params), mimetype='text/csv')
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename=all_labs_assets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv'
     )
+    response.call_on_close(connection.release)
+    return response
 
 
-@app.route('/admin/labs/<int:lab_id>/assets/export/pdf')
+@app.route('/admin/assets/export/excel')
 @admin_required
-def admin_export_assets_pdf(lab_id):
-    """Export selected or filtered assets to a simple PDF table"""
+def admin_export_all_assets_excel():
+    """Export matching assets from every lab to Excel (add background=1 to queue it as a job)"""
+    filters = _asset_export_filters(request.args)
+    fallback_url = url_for('admin_assets_search', **filters)
+    if request.args.get('background') == '1':
+        job_id = submit_job('export_assets_excel', {'lab_id': None, 'filters': filters, 'asset_ids': []})
+        return _job_submitted(job_id, fallback_url)
+
+    connection = get_db_connection()
+    if not connection:
+        flash('Database connection error', 'error')
+        return redirect(fallback_url)
+
+    output = tempfile.TemporaryFile()
+    try:
+        count = export_assets_xlsx(connection, output, None, filters)
+    except mysql.connector.Error as err:
+        output.close()
+        logger.error(f"Export assets error: {err}")
+        flash('Error exporting assets', 'error')
+        return redirect(fallback_url)
+    finally:
+        connection.close()
+
+    log_admin_action('Export Assets Excel', f'All labs exported {count} assets to Excel')
+    return _send_xlsx(output, f'all_labs_assets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx')
+
+
+def _export_assets_pdf_response(lab_id, fallback_url):
+    """Send an asset PDF report, or queue it as a job when asked to or when it is large"""
     try:
-        from reportlab.lib.pagesizes import A4, landscape
-        from reportlab.lib import colors
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-        from reportlab.lib.styles import getSampleStyleSheet
+        import reportlab  # noqa: F401
     except ImportError:
         flash('PDF export requires reportlab. Please install it or use Excel export.', 'error')
-        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+        return redirect(fallback_url)
 
     asset_ids = request.args.getlist('asset_ids', type=int)
+    job_params = {'lab_id': lab_id, 'filters': _asset_export_filters(request.args), 'asset_ids': asset_ids}
+    if request.args.get('background') == '1':
+        return _job_submitted(submit_job('export_assets_pdf', job_params), fallback_url)
 
     connection = get_db_connection()
     if not connection:
         flash('Database connection error', 'error')
-        return redirect(url_for('admin_lab_assets', lab_id=lab_id))
+        return redirect(fallback_url)
 
-    cursor = connection.cursor(dictionary=True)
+    output = tempfile.TemporaryFile()
     try:
-        assets = _fetch_assets_for_export(cursor, lab_id, request.args, asset_ids or None)
+        if _count_assets_for_export(connection, lab_id, request.args, asset_ids) > PDF_BACKGROUND_ROWS:
+            output.close()
+            return _job_submitted(submit_job('export_assets_pdf', job_params), fallback_url)
+        count = export_assets_pdf(connection, output, lab_id, request.args, asset_ids)
+    except mysql.connector.Error as err:
+        output.close()
+        logger.error(f"Export assets PDF error: {err}")
+        flash('Error exporting assets', 'error')
+        return redirect(fallback_url)
     finally:
-        cursor.close()
         connection.close()
+    output.seek(0)
 
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=landscape(A4))
-    styles = getSampleStyleSheet()
-
-    data = [[
-        'Asset ID', 'Asset Name', 'Asset Code', 'Category', 'Status', 'Stock Date', 'Description'
-    ]]
-    for a in assets:
-        data.append([
-            str(a['id']), a['name'], a.get('asset_code') or '', a['category'], a['status'],
-            str(a.get('stock_date') or ''), a.get('description') or ''
-        ])
-
-    table = Table(data, repeatRows=1)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0,0), (-1,0), colors.HexColor('#f0f0f0')),
-        ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-        ('GRID', (0,0), (-1,-1), 0.25, colors.grey),
-        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-    ]))
-
-    doc.build([Paragraph(f"Lab {lab_id} Assets Export ({len(assets)} items)", styles['Heading2']), table])
-    buffer.seek(0)
-
-    log_admin_action('Export Assets PDF', f'Lab #{lab_id} exported {len(assets)} assets to PDF')
+    scope = f'lab_{lab_id}' if lab_id is not None else 'all_labs'
+    log_admin_action('Export Assets PDF', f"{f'Lab #{lab_id}' if lab_id is not None else 'All labs'} exported {count} assets to PDF")
     return send_file(
-        buffer,
+        output,
         mimetype='application/pdf',
         as_attachment=True,
-        download_name=f'lab_{lab_id}_assets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+        download_name=f'{scope}_assets_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
     )
 
+
+@app.route('/admin/labs/<int:lab_id>/assets/export/pdf')
+@admin_required
+def admin_export_assets_pdf(lab_id):
+    """Export selected or filtered assets to a paginated PDF report (large reports run as background jobs)"""
+    return _export_assets_pdf_response(lab_id, url_for('admin_lab_assets', lab_id=lab_id))
+
+
+@app.route('/admin/assets/export/pdf')
+@admin_required
+def admin_export_all_assets_pdf():
+    """Cross-lab PDF report of assets matching the search/category/status filters"""
+    return _export_assets_pdf_response(None, url_for('admin_assets_search', **_asset_export_filters(request.args)))
+
+
 @app.route('/admin/labs/<int:lab_id>/assets/<int:asset_id>/edit', methods=['POST'])
 @admin_required
 def admin_edit_asset(lab_id, asset_id):
@@ -1957,9 +4699,15 @@ def admin_edit_asset(lab_id, asset_id):
             """,
             (name, asset_code or None, category, status, stock_date, description, asset_id, lab_id),
         )
+        bump_table_versions(cursor, 'lab_assets', *(() if category_row else ('asset_categories',)))
         connection.commit()
+        if not category_row:
+            _invalidate_asset_categories()
         log_admin_action('Edit Asset', f'Edited asset #{asset_id} in lab #{lab_id}')
         flash('Asset updated successfully!', 'success')
+    except mysql.connector.IntegrityError:
+        connection.rollback()
+        flash(f'Asset code {asset_code} already exists in this lab', 'error')
     except mysql.connector.Error as err:
         connection.rollback()
         logger.error(f"Edit asset error: {err}")
@@ -1983,6 +4731,7 @@ def admin_delete_asset(lab_id, asset_id):
     cursor = connection.cursor()
     try:
         cursor.execute("DELETE FROM lab_assets WHERE id = %s AND lab_id = %s", (asset_id, lab_id))
+        bump_table_versions(cursor, 'lab_assets')
         connection.commit()
         log_admin_action('Delete Asset', f'Deleted asset #{asset_id} from lab #{lab_id}')
         flash('Asset deleted successfully!', 'success')
@@ -2020,6 +4769,7 @@ def admin_edit_lab(lab_id):
             """,
             (name, status, lab_id),
         )
+        bump_table_versions(cursor, 'laboratory')
         connection.commit()
         log_admin_action('Edit Lab', f'Updated lab: {name} (ID: {lab_id})')
         flash('Laboratory updated successfully!', 'success')
@@ -2062,6 +4812,7 @@ def admin_delete_lab(lab_id):
 
         # Safe to delete
         cursor.execute("DELETE FROM laboratory WHERE id = %s", (lab_id,))
+        bump_table_versions(cursor, 'laboratory')
         connection.commit()
         log_admin_action('Delete Lab', f"Deleted lab: {lab['name']} (ID: {lab_id})")
         flash('Laboratory deleted successfully!', 'success')
@@ -2076,6 +4827,417 @@ def admin_delete_lab(lab_id):
         cursor.close()
         connection.close()
 
+# ---------------------------------------------------------------------------
+# Background jobs
+#
+# Heavy exports and imports can be queued instead of running inside the
+# request worker. Jobs are rows in a small SQLite database under JOB_DIR, so
+# status survives restarts and is shared by every web worker; they run in a
+# process pool and write their artifact next to the database, where it stays
+# downloadable until gc_jobs() removes it after JOB_TTL_HOURS.
+# ---------------------------------------------------------------------------
+
+_JOB_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        params TEXT NOT NULL,
+        status TEXT NOT NULL DEFAULT 'queued',
+        progress INTEGER NOT NULL DEFAULT 0,
+        total INTEGER,
+        message TEXT,
+        artifact TEXT,
+        download_name TEXT,
+        mimetype TEXT,
+        created_by TEXT,
+        owner TEXT,
+        created_at TEXT NOT NULL,
+        started_at TEXT,
+        finished_at TEXT
+    )
+"""
+_job_store_ready = False
+_job_executor = None
+_job_executor_lock = threading.Lock()
+
+
+def _job_now():
+    return datetime.now().isoformat(timespec='seconds')
+
+
+def _job_owner():
+    """Identifies the web process whose pool runs a job"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _job_owner_gone(owner):
+    """Whether the process recorded as a job's owner can no longer be running it"""
+    host, _, pid = (owner or '').rpartition(':')
+    if not pid.isdigit():
+        return True
+    if host != socket.gethostname():
+        return False
+    if int(pid) == os.getpid():
+        # This process has only just opened the store, so the job predates it (a recycled pid)
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass
+    return False
+
+
+def _fail_orphaned_jobs(db):
+    """Mark queued/running jobs whose owning process has exited as failed.
+
+    The process pool dies with its web process, so these jobs would
+    otherwise stay queued or running forever.
+    """
+    rows = db.execute("SELECT id, params, owner FROM jobs WHERE status IN ('queued', 'running')").fetchall()
+    orphaned = [row for row in rows if _job_owner_gone(row['owner'])]
+    for row in orphaned:
+        upload = json.loads(row['params']).get('upload')
+        if upload and os.path.exists(upload):
+            os.remove(upload)
+    db.executemany(
+        "UPDATE jobs SET status = 'failed', message = ?, finished_at = ? WHERE id = ?",
+        [('Interrupted by a server restart; please submit it again', _job_now(), row['id']) for row in orphaned]
+    )
+    if orphaned:
+        logger.warning(f"Marked {len(orphaned)} interrupted background job(s) as failed")
+
+
+def _init_job_store():
+    """Create JOB_DIR and the jobs table once per process.
+
+    In a web process (not a pool worker) this also fails the jobs left
+    behind by web processes that have exited.
+    """
+    global _job_store_ready
+    if _job_store_ready:
+        return
+    os.makedirs(os.path.join(JOB_DIR, 'uploads'), exist_ok=True)
+    os.makedirs(os.path.join(JOB_DIR, 'previews'), exist_ok=True)
+    with closing(sqlite3.connect(os.path.join(JOB_DIR, 'jobs.sqlite3'), timeout=30)) as db:
+        db.row_factory = sqlite3.Row
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(_JOB_SCHEMA)
+        try:
+            db.execute("ALTER TABLE jobs ADD COLUMN owner TEXT")
+        except sqlite3.OperationalError:
+            pass
+        db.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at)")
+        if multiprocessing.parent_process() is None:
+            _fail_orphaned_jobs(db)
+        db.commit()
+    _job_store_ready = True
+
+
+def _jobs_db():
+    _init_job_store()
+    db = sqlite3.connect(os.path.join(JOB_DIR, 'jobs.sqlite3'), timeout=30)
+    db.row_factory = sqlite3.Row
+    return db
+
+
+def get_job(job_id):
+    with closing(_jobs_db()) as db:
+        row = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if not row:
+        return None
+    job = dict(row)
+    job['params'] = json.loads(job['params'])
+    return job
+
+
+def list_jobs(limit=50):
+    with closing(_jobs_db()) as db:
+        rows = db.execute("SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)).fetchall()
+    return [dict(row) for row in rows]
+
+
+def _update_job(job_id, **fields):
+    assignments = ', '.join(f"{column} = ?" for column in fields)
+    with closing(_jobs_db()) as db, db:
+        db.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+
+def _get_job_executor():
+    global _job_executor
+    with _job_executor_lock:
+        if _job_executor is None:
+            # spawn: workers start from a clean interpreter instead of forking threads and sockets
+            _job_executor = ProcessPoolExecutor(max_workers=JOB_WORKERS,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return _job_executor
+
+
+def submit_job(kind, params, upload=None):
+    """Queue a job for the worker pool and return its id.
+
+    `upload` is an optional werkzeug FileStorage saved under JOB_DIR/uploads;
+    its path is passed to the handler as params['upload'].
+    """
+    global _job_executor
+    gc_jobs()
+    job_id = uuid.uuid4().hex
+    if upload is not None:
+        params = dict(params, upload=os.path.join(JOB_DIR, 'uploads', job_id + os.path.splitext(upload.filename)[1].lower()))
+        _init_job_store()
+        upload.save(params['upload'])
+    with closing(_jobs_db()) as db, db:
+        db.execute(
+            "INSERT INTO jobs (id, kind, params, created_by, owner, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (job_id, kind, json.dumps(params), session.get('admin_username'), _job_owner(), _job_now())
+        )
+    try:
+        _get_job_executor().submit(run_job, job_id)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); replace the pool once
+        with _job_executor_lock:
+            _job_executor = None
+        _get_job_executor().submit(run_job, job_id)
+    return job_id
+
+
+def _job_progress(job_id):
+    """Progress callback for handlers, writing at most every JOB_PROGRESS_INTERVAL seconds"""
+    last = [0.0]
+
+    def progress(done, total=None):
+        now = time.monotonic()
+        if now - last[0] < JOB_PROGRESS_INTERVAL:
+            return
+        last[0] = now
+        fields = {'progress': done}
+        if total is not None:
+            fields['total'] = total
+        _update_job(job_id, **fields)
+
+    return progress
+
+
+def _count_query(connection, query, params=()):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(query, params)
+        return cursor.fetchone()[0]
+    finally:
+        cursor.close()
+
+
+def _upload_row_count(path, file_format):
+    """Data rows in an import upload when that is cheap to know exactly, else None"""
+    if file_format in ('.jsonl', '.ndjson'):
+        with open(path, 'rb') as upload:
+            return sum(1 for line in upload if line.strip())
+    if file_format == '.xlsx':
+        wb = load_workbook(path, read_only=True)
+        try:
+            max_row = wb.active.max_row
+        finally:
+            wb.close()
+        return max_row - 1 if max_row else None
+    return None
+
+
+def _job_artifact(job, extension):
+    return os.path.join(JOB_DIR, f"{job['id']}.{extension}")
+
+
+def _job_stamp():
+    return datetime.now().strftime("%Y%m%d_%H%M%S")
+
+
+def _job_export_inventory(job, connection, progress):
+    progress(0, _count_query(connection, "SELECT COUNT(*) FROM consumables"))
+    path = _job_artifact(job, 'xlsx')
+    with open(path, 'wb') as output:
+        count = export_inventory_xlsx(connection, output, progress)
+    return {
+        'message': f'Exported {count} items',
+        'progress': count,
+        'artifact': path,
+        'download_name': f'inventory_export_{_job_stamp()}.xlsx',
+        'mimetype': XLSX_MIMETYPE,
+        'audit': ('Export Inventory', f'Exported {count} items to Excel (background job)'),
+    }
+
+
+def _job_export_assets_excel(job, connection, progress):
+    params = job['params']
+    lab_id = params['lab_id']
+    progress(0, _count_query(connection, *_assets_export_query(lab_id, params['filters'], params['asset_ids'],
+                                                               columns='COUNT(*)')))
+    path = _job_artifact(job, 'xlsx')
+    with open(path, 'wb') as output:
+        count = export_assets_xlsx(connection, output, lab_id, params['filters'], params['asset_ids'], progress)
+    scope = f'lab_{lab_id}' if lab_id is not None else 'all_labs'
+    return {
+        'message': f'Exported {count} assets',
+        'progress': count,
+        'artifact': path,
+        'download_name': f'{scope}_assets_{_job_stamp()}.xlsx',
+        'mimetype': XLSX_MIMETYPE,
+        'audit': ('Export Assets Excel', f"{f'Lab #{lab_id}' if lab_id is not None else 'All labs'} exported "
+                                         f"{count} assets to Excel (background job)"),
+    }
+
+
+def _job_export_assets_pdf(job, connection, progress):
+    params = job['params']
+    lab_id = params['lab_id']
+    progress(0, _count_query(connection, *_assets_export_query(lab_id, params['filters'], params['asset_ids'],
+                                                               columns='COUNT(*)')))
+    path = _job_artifact(job, 'pdf')
+    with open(path, 'wb') as output:
+        count = export_assets_pdf(connection, output, lab_id, params['filters'], params['asset_ids'], progress)
+    scope = f'lab_{lab_id}' if lab_id is not None else 'all_labs'
+    return {
+        'message': f'Exported {count} assets',
+        'progress': count,
+        'artifact': path,
+        'download_name': f'{scope}_assets_{_job_stamp()}.pdf',
+        'mimetype': 'application/pdf',
+        'audit': ('Export Assets PDF', f"{f'Lab #{lab_id}' if lab_id is not None else 'All labs'} exported "
+                                       f"{count} assets to PDF (background job)"),
+    }
+
+
+def _job_import_assets(job, connection, progress):
+    params = job['params']
+    lab_id = params['lab_id']
+    file_format = params.get('file_format', '.xlsx')
+    total = _upload_row_count(params['upload'], file_format)
+    if total is not None:
+        progress(0, total)
+    result = import_assets(connection, params['upload'], lab_id, file_format, progress, params.get('mode', 'skip'))
+    return {
+        'message': _import_summary(result),
+        'audit': ('Import Assets', _import_audit_details(result, lab_id) + ' (background job)'),
+    }
+
+
+JOB_HANDLERS = {
+    'export_inventory': _job_export_inventory,
+    'export_assets_excel': _job_export_assets_excel,
+    'export_assets_pdf': _job_export_assets_pdf,
+    'import_assets': _job_import_assets,
+}
+
+
+def run_job(job_id):
+    """Worker-process entry point: run one queued job and record its outcome"""
+    job = get_job(job_id)
+    if not job or job['status'] != 'queued':
+        return
+    _update_job(job_id, status='running', started_at=_job_now())
+
+    connection = get_db_connection()
+    try:
+        if not connection:
+            raise RuntimeError('Database connection error')
+        outcome = JOB_HANDLERS[job['kind']](job, connection, _job_progress(job_id))
+    except Exception as err:
+        logger.exception(f"Background job {job_id} ({job['kind']}) failed")
+        _update_job(job_id, status='failed', message=str(err) or err.__class__.__name__, finished_at=_job_now())
+        return
+    finally:
+        if connection:
+            connection.close()
+        upload = job['params'].get('upload')
+        if upload and os.path.exists(upload):
+            os.remove(upload)
+
+    audit = outcome.pop('audit', None)
+    if audit:
+        log_admin_actions([audit], username=job['created_by'])
+        audit_writer.flush()
+    _update_job(job_id, status='done', finished_at=_job_now(), **outcome)
+
+
+def gc_jobs(ttl_hours=None):
+    """Delete jobs (and their artifacts/uploads) created more than ttl_hours ago; returns the count.
+
+    Import previews older than IMPORT_PREVIEW_TTL_MINUTES are pruned as well,
+    except those a queued or running import job is about to read.
+    """
+    ttl_hours = JOB_TTL_HOURS if ttl_hours is None else ttl_hours
+    cutoff = (datetime.now() - timedelta(hours=ttl_hours)).isoformat(timespec='seconds')
+    with closing(_jobs_db()) as db, db:
+        expired = db.execute("SELECT id, params, artifact FROM jobs WHERE created_at < ?", (cutoff,)).fetchall()
+        for row in expired:
+            for path in (row['artifact'], json.loads(row['params']).get('upload')):
+                if path and os.path.exists(path):
+                    os.remove(path)
+        db.executemany("DELETE FROM jobs WHERE id = ?", [(row['id'],) for row in expired])
+        in_use = {json.loads(row['params']).get('upload') for row in db.execute(
+            "SELECT params FROM jobs WHERE status IN ('queued', 'running')")}
+    preview_cutoff = time.time() - IMPORT_PREVIEW_TTL_MINUTES * 60
+    with os.scandir(os.path.join(JOB_DIR, 'previews')) as entries:
+        for entry in entries:
+            if entry.stat().st_mtime < preview_cutoff and entry.path not in in_use:
+                os.remove(entry.path)
+    return len(expired)
+
+
+@app.cli.command('gc-jobs')
+@click.option('--ttl-hours', type=int, default=None, help='Override JOB_TTL_HOURS')
+def gc_jobs_command(ttl_hours):
+    """Remove expired background jobs and their files"""
+    removed = gc_jobs(ttl_hours)
+    click.echo(f"Removed {removed} expired job(s)")
+
+
+def _job_payload(job):
+    payload = {key: job[key] for key in (
+        'id', 'kind', 'status', 'progress', 'total', 'message', 'created_by', 'created_at', 'finished_at'
+    )}
+    payload['status_url'] = url_for('admin_job_status', job_id=job['id'])
+    if job['status'] == 'done' and job['artifact']:
+        payload['download_url'] = url_for('admin_job_download', job_id=job['id'])
+    return payload
+
+
+def _job_submitted(job_id, fallback_url):
+    """202 with the job's status for fetch() callers; flash + redirect for plain form/link submits"""
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(_job_payload(get_job(job_id))), 202
+    flash(f'Job queued. Track its progress at {url_for("admin_job_status", job_id=job_id)}', 'info')
+    return redirect(fallback_url)
+
+
+@app.route('/admin/jobs')
+@admin_required
+def admin_jobs():
+    """Recent background jobs as JSON"""
+    return jsonify({'jobs': [_job_payload(job) for job in list_jobs()]})
+
+
+@app.route('/admin/jobs/<job_id>')
+@admin_required
+def admin_job_status(job_id):
+    """Status and progress of one background job"""
+    job = get_job(job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(_job_payload(job))
+
+
+@app.route('/admin/jobs/<job_id>/download')
+@admin_required
+def admin_job_download(job_id):
+    """Download a finished job's artifact"""
+    job = get_job(job_id)
+    if not job or job['status'] != 'done' or not job['artifact'] or not os.path.exists(job['artifact']):
+        flash('That export is not available (it may still be running or has expired)', 'error')
+        return redirect(url_for('admin_dashboard'))
+    return send_file(job['artifact'], mimetype=job['mimetype'], as_attachment=True,
+                     download_name=job['download_name'])
+
+
 if __name__ == '__main__':
     # Initialize database
     if init_database():
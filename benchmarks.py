@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for ProTrack-RPT hot paths.
+Run against a scratch database (tables are prefixed with bench_), e.g.:
+
+    python benchmarks.py search --rows 1000000
+    python benchmarks.py excel --rows 100000
+    python benchmarks.py import --rows 100000
+    python benchmarks.py pdf --rows 10000 100000
+"""
+
+import argparse
+import csv
+import datetime
+import json
+import multiprocessing
+import os
+import random
+import resource
+import statistics
+import sys
+import tempfile
+import time
+
+import mysql.connector
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from app import (
+    DB_CONFIG, ASSET_EXPORT_HEADERS, ASSET_IMPORT_READERS, ASSET_PDF_HEADERS, ASSET_PDF_WIDTHS,
+    normalize_asset_row, parse_search_query, write_pdf_report, write_xlsx,
+)
+
+WORDS = [
+    'laptop', 'lenovo', 'dell', 'monitor', 'keyboard', 'mouse', 'printer', 'router', 'switch',
+    'oscilloscope', 'multimeter', 'soldering', 'station', 'microscope', 'projector', 'cable',
+    'chair', 'table', 'cabinet', 'drill', 'hammer', 'screwdriver', 'battery', 'charger',
+    'sensor', 'arduino', 'raspberry', 'breadboard', 'resistor', 'capacitor', 'transformer',
+]
+SEARCH_QUERIES = ['laptop', 'lap', 'soldering station', 'CU1234', 'arduino -raspberry']
+CHUNK_SIZE = 10000
+
+
+def get_db_connection():
+    """Create and return a database connection"""
+    try:
+        return mysql.connector.connect(**DB_CONFIG)
+    except mysql.connector.Error as err:
+        print(f"Database connection error: {err}")
+        return None
+
+
+def timed_query(cursor, sql, params, repeat):
+    """Median wall-clock milliseconds for executing and fetching a query"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        cursor.execute(sql, params)
+        cursor.fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def _fake_asset(rng):
+    words = rng.sample(WORDS, 3)
+    return (
+        ' '.join(w.title() for w in words[:2]),
+        f"IPRC-T/LAB/CU{rng.randint(0, 999999)}",
+        f"{words[0]} {words[1]} {words[2]} for lab use, unit {rng.randint(1, 500)}",
+    )
+
+
+def bench_search(args):
+    """Compare LIKE scans with FULLTEXT boolean-mode search on a large table"""
+    connection = get_db_connection()
+    if not connection:
+        sys.exit(1)
+    cursor = connection.cursor()
+    rng = random.Random(42)
+
+    if args.rebuild:
+        cursor.execute("DROP TABLE IF EXISTS bench_search_assets")
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS bench_search_assets (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            asset_code VARCHAR(100),
+            description TEXT
+        )
+    """)
+    cursor.execute("SELECT COUNT(*) FROM bench_search_assets")
+    existing = cursor.fetchone()[0]
+    print(f"Seeding {max(args.rows - existing, 0)} rows (have {existing})...")
+    while existing < args.rows:
+        batch = [_fake_asset(rng) for _ in range(min(CHUNK_SIZE, args.rows - existing))]
+        cursor.executemany(
+            "INSERT INTO bench_search_assets (name, asset_code, description) VALUES (%s, %s, %s)", batch
+        )
+        connection.commit()
+        existing += len(batch)
+
+    try:
+        cursor.execute("CREATE FULLTEXT INDEX ft_bench_search ON bench_search_assets (name, asset_code, description)")
+    except mysql.connector.Error:
+        pass
+
+    print(f"{'query':<22}{'LIKE ms':>12}{'FULLTEXT ms':>14}")
+    for text in SEARCH_QUERIES:
+        like = f'%{text}%'
+        like_ms = timed_query(cursor, """
+            SELECT id, name FROM bench_search_assets
+            WHERE name LIKE %s OR asset_code LIKE %s OR description LIKE %s
+            LIMIT 50
+        """, (like, like, like), args.repeat)
+        expr = parse_search_query(text)
+        ft_ms = timed_query(cursor, """
+            SELECT id, name, MATCH(name, asset_code, description) AGAINST (%s IN BOOLEAN MODE) AS relevance
+            FROM bench_search_assets
+            WHERE MATCH(name, asset_code, description) AGAINST (%s IN BOOLEAN MODE)
+            ORDER BY relevance DESC
+            LIMIT 50
+        """, (expr, expr), args.repeat) if expr else float('nan')
+        print(f"{text:<22}{like_ms:>12.1f}{ft_ms:>14.1f}")
+
+    cursor.close()
+    connection.close()
+
+
+def _asset_rows(count):
+    """Synthetic lab_assets export rows, generated lazily like an unbuffered cursor"""
+    rng = random.Random(7)
+    now = datetime.datetime.now()
+    for i in range(1, count + 1):
+        name, code, description = _fake_asset(rng)
+        yield (i, name, code, 'Lab Equipment', 'Available', now.date(), description, now, now)
+
+
+def _legacy_xlsx(output, headers, rows):
+    """Previous export approach: normal workbook, cell by cell, then a full width pass"""
+    wb = Workbook()
+    ws = wb.active
+    for col, header in enumerate(headers, 1):
+        ws.cell(row=1, column=col, value=header).font = Font(bold=True)
+    for row_idx, row in enumerate(rows, start=2):
+        for col, value in enumerate(row, 1):
+            ws.cell(row=row_idx, column=col, value=value)
+    for column in ws.columns:
+        ws.column_dimensions[column[0].column_letter].width = min(max(len(str(c.value)) for c in column) + 2, 50)
+    wb.save(output)
+
+
+def _excel_worker(engine, rows, results):
+    start = time.perf_counter()
+    with open(os.devnull, 'wb') as output:
+        if engine == 'legacy':
+            _legacy_xlsx(output, ASSET_EXPORT_HEADERS, _asset_rows(rows))
+        else:
+            write_xlsx(output, 'Assets', ASSET_EXPORT_HEADERS, _asset_rows(rows))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((engine, elapsed, peak_mb))
+
+
+def bench_excel(args):
+    """Rows/sec and peak RSS of the legacy vs write-only Excel export engines"""
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    print(f"{'engine':<12}{'rows/sec':>12}{'seconds':>10}{'peak RSS MB':>14}")
+    for engine in ('legacy', 'write_only'):
+        # Separate process per engine so peak RSS is not shared between runs
+        proc = ctx.Process(target=_excel_worker, args=(engine, args.rows, results))
+        proc.start()
+        name, elapsed, peak_mb = results.get()
+        proc.join()
+        print(f"{name:<12}{args.rows / elapsed:>12.0f}{elapsed:>10.2f}{peak_mb:>14.1f}")
+
+
+IMPORT_HEADERS = ['Asset Name', 'Asset Code', 'Category', 'Status', 'Stock Date', 'Description']
+
+
+def _import_rows(count):
+    """Synthetic rows in import-template column order"""
+    for _, name, code, category, status, stock_date, description, _, _ in _asset_rows(count):
+        yield (name, code, category, status, stock_date.strftime('%d/%m/%Y'), description)
+
+
+def _write_import_file(path, fmt, rows):
+    if fmt == '.xlsx':
+        with open(path, 'wb') as output:
+            write_xlsx(output, 'Assets', IMPORT_HEADERS, _import_rows(rows))
+    elif fmt == '.csv':
+        with open(path, 'w', newline='', encoding='utf-8') as output:
+            writer = csv.writer(output)
+            writer.writerow(IMPORT_HEADERS)
+            writer.writerows(_import_rows(rows))
+    else:
+        with open(path, 'w', encoding='utf-8') as output:
+            for row in _import_rows(rows):
+                output.write(json.dumps(dict(zip(IMPORT_HEADERS, row))) + '\n')
+
+
+def _import_worker(fmt, path, results):
+    start = time.perf_counter()
+    count = sum(1 for raw in ASSET_IMPORT_READERS[fmt](path) if normalize_asset_row(raw))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((fmt, count, elapsed, peak_mb))
+
+
+def bench_import(args):
+    """Parse + normalize throughput of the xlsx, CSV and JSON-lines import readers (no database writes)"""
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'format':<8}{'file MB':>10}{'rows/sec':>12}{'seconds':>10}{'peak RSS MB':>14}")
+        for fmt in ('.xlsx', '.csv', '.jsonl'):
+            path = os.path.join(tmp, 'assets' + fmt)
+            _write_import_file(path, fmt, args.rows)
+            proc = ctx.Process(target=_import_worker, args=(fmt, path, results))
+            proc.start()
+            name, count, elapsed, peak_mb = results.get()
+            proc.join()
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            print(f"{name:<8}{size_mb:>10.1f}{count / elapsed:>12.0f}{elapsed:>10.2f}{peak_mb:>14.1f}")
+
+
+def _pdf_rows(count):
+    for asset_id, name, code, category, status, stock_date, description, _, _ in _asset_rows(count):
+        yield (asset_id, name, code, category, status, stock_date, description)
+
+
+def _legacy_pdf(output, rows):
+    """Previous PDF approach: every row in one platypus Table laid out by SimpleDocTemplate"""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import Paragraph, SimpleDocTemplate, Table, TableStyle
+
+    doc = SimpleDocTemplate(output, pagesize=landscape(A4))
+    data = [ASSET_PDF_HEADERS] + [[str(v or '') for v in row] for row in rows]
+    table = Table(data, repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#f0f0f0')),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ]))
+    doc.build([Paragraph(f"Assets Export ({len(data) - 1} items)", getSampleStyleSheet()['Heading2']), table])
+
+
+def _pdf_worker(engine, rows, results):
+    start = time.perf_counter()
+    with open(os.devnull, 'wb') as output:
+        if engine == 'legacy':
+            _legacy_pdf(output, _pdf_rows(rows))
+        else:
+            write_pdf_report(output, 'Assets', ASSET_PDF_HEADERS, _pdf_rows(rows), ASSET_PDF_WIDTHS, (1, 6))
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    results.put((engine, elapsed, peak_mb))
+
+
+def bench_pdf(args):
+    """Seconds and peak RSS of the single-table vs paginated PDF report engines"""
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    print(f"{'engine':<10}{'rows':>10}{'rows/sec':>12}{'seconds':>10}{'peak RSS MB':>14}")
+    for rows in args.rows:
+        for engine in ('legacy', 'paged'):
+            if engine == 'legacy' and rows > args.legacy_max:
+                print(f"{engine:<10}{rows:>10}{'skipped (--legacy-max)':>36}")
+                continue
+            proc = ctx.Process(target=_pdf_worker, args=(engine, rows, results))
+            proc.start()
+            name, elapsed, peak_mb = results.get()
+            proc.join()
+            print(f"{name:<10}{rows:>10}{rows / elapsed:>12.0f}{elapsed:>10.2f}{peak_mb:>14.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='ProTrack-RPT benchmarks')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    search = sub.add_parser('search', help='LIKE vs FULLTEXT search latency')
+    search.add_argument('--rows', type=int, default=1000000)
+    search.add_argument('--repeat', type=int, default=5)
+    search.add_argument('--rebuild', action='store_true', help='drop and reseed the benchmark table')
+    search.set_defaults(func=bench_search)
+
+    excel = sub.add_parser('excel', help='Excel export throughput and peak memory')
+    excel.add_argument('--rows', type=int, default=100000)
+    excel.set_defaults(func=bench_excel)
+
+    imports = sub.add_parser('import', help='Import parse throughput per file format')
+    imports.add_argument('--rows', type=int, default=100000)
+    imports.set_defaults(func=bench_import)
+
+    pdf = sub.add_parser('pdf', help='PDF report generation time and peak memory')
+    pdf.add_argument('--rows', type=int, nargs='+', default=[10000, 100000])
+    pdf.add_argument('--legacy-max', type=int, default=10000,
+                     help='skip the single-table engine above this many rows (it is super-linear)')
+    pdf.set_defaults(func=bench_pdf)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,8 @@ CREATE DATABASE IF NOT EXISTS protrack_rpt;
 USE protrack_rpt;
 
 -- Drop existing tables if they exist
+DROP TABLE IF EXISTS cart_items;
+DROP TABLE IF EXISTS carts;
 DROP TABLE IF EXISTS order_items;
 DROP TABLE IF EXISTS orders;
 DROP TABLE IF EXISTS consumables;
@@ -29,7 +31,8 @@ CREATE TABLE orders (
     department VARCHAR(255) NOT NULL,
     purpose TEXT NOT NULL,
     date_needed DATE NOT NULL,
-    status ENUM('Pending', 'Approved', 'Rejected') DEFAULT 'Pending',
+    status ENUM('Pending', 'Approved', 'Rejected', 'Expired') DEFAULT 'Pending',
+    stock_reserved TINYINT(1) DEFAULT 0,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -60,6 +63,39 @@ CREATE TABLE audit_logs (
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Create dashboard_stats summary table (single row, refreshed by the app)
+CREATE TABLE IF NOT EXISTS dashboard_stats (
+    id TINYINT PRIMARY KEY,
+    total_items INT NOT NULL DEFAULT 0,
+    total_orders INT NOT NULL DEFAULT 0,
+    pending_orders INT NOT NULL DEFAULT 0,
+    low_stock INT NOT NULL DEFAULT 0,
+    refreshed_at TIMESTAMP NULL
+);
+
+-- Create server-side cart tables (the session only stores the cart id)
+CREATE TABLE IF NOT EXISTS carts (
+    id CHAR(32) PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX idx_carts_updated_at (updated_at)
+);
+
+CREATE TABLE IF NOT EXISTS cart_items (
+    cart_id CHAR(32) NOT NULL,
+    consumable_id INT NOT NULL,
+    quantity INT NOT NULL,
+    PRIMARY KEY (cart_id, consumable_id),
+    FOREIGN KEY (cart_id) REFERENCES carts(id) ON DELETE CASCADE,
+    FOREIGN KEY (consumable_id) REFERENCES consumables(id) ON DELETE CASCADE
+);
+
+-- Create table_versions change counters (bumped by the app after writes; drive ETags)
+CREATE TABLE IF NOT EXISTS table_versions (
+    table_name VARCHAR(64) PRIMARY KEY,
+    version BIGINT UNSIGNED NOT NULL DEFAULT 0
+);
+
 -- Create laboratory table
 CREATE TABLE laboratory (
     id INT AUTO_INCREMENT PRIMARY KEY,
@@ -133,12 +169,22 @@ INSERT INTO audit_logs (admin_username, action, details) VALUES
 -- Create indexes for better performance
 CREATE INDEX idx_consumables_category ON consumables(category);
 CREATE INDEX idx_consumables_name ON consumables(name);
+CREATE INDEX idx_consumables_created_at_id ON consumables(created_at, id);
+CREATE INDEX idx_consumables_category_created_at_id ON consumables(category, created_at, id);
 CREATE INDEX idx_orders_status ON orders(status);
+CREATE INDEX idx_orders_status_created_at ON orders(status, created_at);
+CREATE INDEX idx_orders_created_at ON orders(created_at);
+CREATE INDEX idx_consumables_quantity ON consumables(quantity);
 CREATE INDEX idx_orders_user_name ON orders(user_name);
+CREATE FULLTEXT INDEX ft_consumables_search ON consumables(name, description, category);
+CREATE FULLTEXT INDEX ft_orders_search ON orders(user_name, department);
 CREATE INDEX idx_order_items_order_id ON order_items(order_id);
 CREATE INDEX idx_order_items_consumable_id ON order_items(consumable_id);
 CREATE INDEX idx_audit_logs_timestamp ON audit_logs(timestamp);
 CREATE INDEX idx_audit_logs_admin_username ON audit_logs(admin_username);
+CREATE INDEX idx_audit_logs_timestamp_id ON audit_logs(timestamp, id);
+CREATE INDEX idx_audit_logs_admin_timestamp_id ON audit_logs(admin_username, timestamp, id);
+CREATE INDEX idx_audit_logs_action_timestamp_id ON audit_logs(action, timestamp, id);
 
 -- Show table structure
 DESCRIBE consumables;